@@ -0,0 +1,50 @@
+"""Benchmarks for AgeCalculator (ex-1)."""
+
+import io
+from datetime import date
+
+import data
+from harness import benchmark, load_exercise
+
+
+ex1 = load_exercise(1)
+
+# A fixed reference date keeps ages, and so the work done, identical between runs
+TODAY = date(2026, 1, 1)
+
+
+def _calculate_ages_batch(count):
+    calculator = ex1.AgeCalculator(TODAY)
+    dates = data.birth_dates(count)
+    yield lambda: calculator.calculate_ages_batch(dates)
+
+
+def _date_validate(count):
+    calculator = ex1.AgeCalculator(TODAY)
+    dates = data.birth_dates(count).tolist()
+
+    def validate_all():
+        # Start cold so the memoized parser has to fill its cache every call
+        ex1.parse_mdy.cache_clear()
+        for date_str in dates:
+            calculator.date_validate(date_str, "%m/%d/%Y")
+    yield validate_all
+
+
+def _process_stream(count):
+    calculator = ex1.AgeCalculator(TODAY)
+    path = data.birth_dates_file(count)
+
+    def process_file():
+        with open(path) as infile:
+            calculator.process_stream(infile, io.StringIO(), io.StringIO())
+    yield process_file
+
+
+for count in (10_000, 1_000_000):
+    benchmark(f"ages.calculate_ages_batch[{count:.0e}]", count)(lambda count=count: _calculate_ages_batch(count))
+    benchmark(f"ages.process_stream[{count:.0e}]", count)(lambda count=count: _process_stream(count))
+
+# Ten million dates only stream; holding them in one batch takes several GB
+benchmark("ages.process_stream[1e+07]", 10_000_000, ("full",), repeat=1)(lambda: _process_stream(10_000_000))
+benchmark("ages.date_validate[1e+05]", 100_000)(lambda: _date_validate(100_000))
@@ -0,0 +1,35 @@
+"""Benchmarks for StudentMarksProcessor.read_marks_file and write_results (ex-3)."""
+
+import os
+import tempfile
+
+import data
+from harness import benchmark, load_exercise
+
+
+ex3 = load_exercise(3)
+
+
+def _read_marks_file(rows):
+    path = data.marks_file(rows)
+    processor = ex3.StudentMarksProcessor()
+    yield lambda: processor.read_marks_file(path)
+
+
+def _write_results(rows, output_format):
+    processor = ex3.StudentMarksProcessor()
+    processor.read_marks_file(data.marks_file(rows))
+    processor.sort_by_overall_mark()
+    with tempfile.TemporaryDirectory() as work_dir:
+        output = os.path.join(work_dir, f"results.{output_format}")
+        yield lambda: processor.write_results(output, output_format)
+
+
+for tier, counts in data.MARKS_ROWS.items():
+    for rows in counts:
+        repeat = 5 if rows <= 1_000_000 else 1
+        benchmark(f"marks.read_marks_file[{rows:.0e}]", rows, (tier,), repeat)(
+            lambda rows=rows: _read_marks_file(rows))
+        for output_format in ("text", "csv"):
+            benchmark(f"marks.write_results.{output_format}[{rows:.0e}]", rows, (tier,), repeat)(
+                lambda rows=rows, output_format=output_format: _write_results(rows, output_format))
@@ -0,0 +1,34 @@
+"""Benchmarks for PrimeNumberGen.find_primes (ex-2)."""
+
+import os
+
+import data
+from harness import benchmark, load_exercise
+
+
+ex2 = load_exercise(2)
+
+
+def _find_primes(start_num, end_num, mode, workers=1):
+    generator = ex2.PrimeNumberGen(workers=workers)
+    yield lambda: generator.find_primes(start_num, end_num, mode=mode)
+
+
+def _range_name(start_num, end_num):
+    return f"{start_num:.0e}-{end_num - start_num:.0e}"
+
+
+for tier, ranges in data.PRIME_RANGES.items():
+    for start_num, end_num in ranges:
+        name = _range_name(start_num, end_num)
+        repeat = 5 if tier == "quick" else 2
+        benchmark(f"primes.find_primes.sieve[{name}]", end_num - start_num + 1, (tier,), repeat)(
+            lambda start_num=start_num, end_num=end_num: _find_primes(start_num, end_num, "sieve"))
+
+# Trial division only on the small range; it exists as the reference the sieve is measured against
+benchmark("primes.find_primes.trial[1e+00-1e+05]", 100_000, repeat=3)(
+    lambda: _find_primes(1, 100_000, "trial"))
+
+# The parallel engine pays off only on big ranges
+benchmark("primes.find_primes.parallel[1e+00-1e+08]", 100_000_000, ("full",), repeat=2)(
+    lambda: _find_primes(1, 100_000_000, "parallel", workers=os.cpu_count()))
@@ -0,0 +1,45 @@
+"""Benchmarks for Weather (ex-4); fetching and logging run against a local stub server."""
+
+import os
+import tempfile
+
+import data
+from harness import benchmark, load_exercise
+
+
+ex4 = load_exercise(4)
+
+
+def _log_weather(count, latency):
+    cities = data.city_names(count)
+    with data.weather_server(latency) as server, tempfile.TemporaryDirectory() as work_dir:
+        client = ex4.Weather("bench", base_url=server.url)
+        output = os.path.join(work_dir, "log.csv")
+
+        def log_all():
+            for city in cities:
+                client.log_weather(city, output)
+            client.get_logger(output).flush()
+        yield log_all
+        client.get_logger(output).close()
+
+
+def _log_many(count, latency, workers):
+    cities = data.city_names(count)
+    with data.weather_server(latency) as server, tempfile.TemporaryDirectory() as work_dir:
+        client = ex4.Weather("bench", base_url=server.url, max_workers=workers)
+        output = os.path.join(work_dir, "log.csv")
+        yield lambda: client.log_many(cities, output)
+        client.get_logger(output).close()
+
+
+def _analyze_many(count):
+    client = ex4.Weather("bench")
+    temperatures, humidities, wind_speeds = data.weather_observations(count)
+    yield lambda: client.analyze_many(temperatures, humidities, wind_speeds)
+
+
+benchmark("weather.log_weather[200]", 200, repeat=3)(lambda: _log_weather(200, 0.0))
+benchmark("weather.log_many[1000,x16,5ms]", 1000, repeat=3)(lambda: _log_many(1000, 0.005, 16))
+benchmark("weather.log_many[5000,x32,5ms]", 5000, ("full",), repeat=3)(lambda: _log_many(5000, 0.005, 32))
+benchmark("weather.analyze_many[1e+06]", 1_000_000)(lambda: _analyze_many(1_000_000))
@@ -0,0 +1,93 @@
+"""
+Synthetic inputs for the benchmarks. Every generator is seeded, so runs compare like with like.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from harness import load_exercise
+
+
+# Large generated files are kept here between runs (override with BENCH_DATA_DIR)
+DATA_DIR = os.getenv("BENCH_DATA_DIR", os.path.join(tempfile.gettempdir(), "python-assignment-bench"))
+
+# (start, end) ranges for find_primes, dense ranges from the origin and a sparse one high up
+PRIME_RANGES = {
+    "quick": [(1, 100_000), (1, 1_000_000), (10**9, 10**9 + 1_000_000)],
+    "full": [(1, 10_000_000), (1, 100_000_000), (10**12, 10**12 + 10_000_000)],
+}
+
+# Student counts for the marks files
+MARKS_ROWS = {
+    "quick": [1_000, 100_000],
+    "full": [1_000_000, 10_000_000],
+}
+
+
+def birth_dates(count, seed=0, invalid_share=0.01, future_share=0.01):
+    """
+    Returns count mm/dd/yyyy strings between 1920 and 2020 as a NumPy array,
+    with invalid_share malformed or impossible dates and future_share dates after 2100.
+    """
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1920, 2021, count)
+    months = rng.integers(1, 13, count)
+    days = rng.integers(1, 29, count)
+
+    kind = rng.random(count)
+    future = kind < future_share
+    invalid = (kind >= future_share) & (kind < future_share + invalid_share)
+    years[future] += 200
+    # Day 31 of a 30-day month, or of February, is rejected by calendar validation
+    months[invalid] = rng.choice([2, 4, 6, 9, 11], int(invalid.sum()))
+    days[invalid] = 31
+
+    return np.char.add(np.char.add(np.char.add(np.char.zfill(months.astype(str), 2), "/"),
+                                   np.char.add(np.char.zfill(days.astype(str), 2), "/")),
+                       years.astype(str))
+
+
+def birth_dates_file(count, seed=0):
+    """Writes birth_dates(count) one per line under DATA_DIR (once) and returns the path."""
+    path = os.path.join(DATA_DIR, f"birth_dates_{count}_{seed}.txt")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        dates = birth_dates(count, seed)
+        _write_atomically(path, lambda file: file.write("\n".join(dates.tolist()) + "\n"))
+    return path
+
+
+def marks_file(rows, seed=0):
+    """Writes a marks file of rows students under DATA_DIR (once) and returns the path."""
+    path = os.path.join(DATA_DIR, f"marks_{rows}_{seed}.txt")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        load_exercise(3).generate_marks_file(temp_path, rows, seed=seed)
+        os.replace(temp_path, path)
+    return path
+
+
+def weather_observations(count, seed=0):
+    """Returns (temperatures, humidities, wind_speeds) arrays covering every category and warning."""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-20, 45, count), rng.uniform(0, 100, count), rng.uniform(0, 25, count)
+
+
+def city_names(count):
+    """Returns count distinct city names."""
+    return [f"city{i:05d}" for i in range(count)]
+
+
+def weather_server(latency=0.0, **options):
+    """Returns an unstarted local stub weather server; use it as a context manager."""
+    return load_exercise(4).StubWeatherServer(latency=latency, **options)
+
+
+def _write_atomically(path, write):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as file:
+        write(file)
+    os.replace(temp_path, path)
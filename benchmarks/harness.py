@@ -0,0 +1,143 @@
+"""
+Case registry, timing and baseline comparison for the benchmark suite.
+
+A benchmark is a generator function that does its setup, yields the callable
+to time, and cleans up after the yield. Registering it with @benchmark adds it
+to CASES under a dotted name such as "marks.read_marks_file[1e5]".
+"""
+
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import namedtuple
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every registered case by name, in registration order
+CASES = {}
+
+Case = namedtuple("Case", "name setup items tiers repeat")
+
+
+def load_exercise(number):
+    """
+    Imports ex-<number>.py from the repository root (the hyphen rules out a plain import).
+    The module is registered in sys.modules so worker processes can unpickle its functions.
+    """
+    name = f"ex{number}"
+    # The exercises import shared modules such as instrumentation from the root
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_DIR, f"ex-{number}.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def benchmark(name, items, tiers=("quick", "full"), repeat=5):
+    """
+    Registers a benchmark case.
+    items is the number of units of work per call, used for the throughput column;
+    tiers lists the suites ('quick', 'full') that include the case;
+    repeat is how many timed calls are made (the best one is reported).
+    """
+    def register(func):
+        CASES[name] = Case(name, contextlib.contextmanager(func), items, tuple(tiers), repeat)
+        return func
+    return register
+
+
+def run_case(case, repeat=None):
+    """
+    Sets the case up, calls it once untimed to warm caches, then times repeat calls
+    with stdout silenced. Returns a result dict with best and median seconds.
+    """
+    repeat = repeat or case.repeat
+    timings = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with case.setup() as func:
+            func()
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        "seconds": best,
+        "median": statistics.median(timings),
+        "items": case.items,
+        "per_second": case.items / best if best else float("inf"),
+        "repeat": repeat,
+    }
+
+
+def environment():
+    """Describes the machine a set of results came from."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baseline(path):
+    """Returns the saved baseline, or an empty one if the file does not exist."""
+    if not os.path.exists(path):
+        return {"environment": None, "results": {}}
+    with open(path) as file:
+        return json.load(file)
+
+
+def environment_differences(baseline):
+    """
+    Returns {key: (baseline value, current value)} for every way this machine differs
+    from the one the baseline was recorded on (empty if they match or there is no baseline).
+    """
+    saved = baseline.get("environment")
+    if not saved:
+        return {}
+    current = environment()
+    return {key: (saved.get(key), value) for key, value in current.items() if saved.get(key) != value}
+
+
+def save_baseline(path, results):
+    """
+    Merges results into the baseline file, keeping entries for cases that were not run.
+    Entries recorded on a different machine are dropped rather than mixed with these.
+    """
+    baseline = load_baseline(path)
+    if environment_differences(baseline):
+        baseline["results"] = {}
+    baseline["environment"] = environment()
+    baseline["results"].update(results)
+    baseline["results"] = dict(sorted(baseline["results"].items()))
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=2)
+        file.write("\n")
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares each result with its baseline entry.
+    Returns {name: ratio} for every case whose best time is more than threshold
+    times its baseline (e.g. 1.25 = 25% slower); cases without a baseline are skipped.
+    Timings from different machines are not comparable; check environment_differences first.
+    """
+    regressions = {}
+    for name, result in results.items():
+        saved = baseline["results"].get(name)
+        if saved and saved["seconds"] > 0:
+            ratio = result["seconds"] / saved["seconds"]
+            if ratio > threshold:
+                regressions[name] = ratio
+    return regressions
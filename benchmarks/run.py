@@ -0,0 +1,100 @@
+"""
+Runs the benchmark suite for all four exercises and checks it against a saved baseline.
+
+    python benchmarks/run.py                     # quick tier, compared with baseline.json
+    python benchmarks/run.py --tier full         # 10^7-row marks files, 10^8 prime ranges, ...
+    python benchmarks/run.py -k marks --save     # run matching cases and record them as the baseline
+    python benchmarks/run.py --list
+
+Exits with status 1 when any case is slower than --threshold times its baseline.
+Baselines are machine-specific: when the Python version, platform or CPU count differs
+from the baseline's, the comparison is skipped (--ignore-environment forces it) and
+--save replaces the baseline instead of merging into it.
+"""
+
+import argparse
+import os
+import sys
+
+import harness
+# Importing the case modules registers their benchmarks
+import bench_ages
+import bench_primes
+import bench_marks
+import bench_weather
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def select_cases(tier, patterns):
+    """Returns the cases in tier whose name contains any of patterns (all cases if none given)."""
+    return [case for case in harness.CASES.values()
+            if tier in case.tiers and (not patterns or any(pattern in case.name for pattern in patterns))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the four exercises")
+    parser.add_argument("--tier", choices=("quick", "full"), default="quick",
+                        help="quick runs in about a minute; full uses the largest inputs (default: quick)")
+    parser.add_argument("-k", dest="patterns", action="append", default=[],
+                        help="only run cases whose name contains this text (repeatable)")
+    parser.add_argument("--repeat", type=int, default=None, help="timed calls per case (default: per case)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save", action="store_true", help="record these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression (default: 1.25)")
+    parser.add_argument("--ignore-environment", action="store_true",
+                        help="compare with a baseline recorded on a different machine anyway")
+    parser.add_argument("--list", action="store_true", help="list the selected cases without running them")
+    args = parser.parse_args()
+
+    cases = select_cases(args.tier, args.patterns)
+    if args.list:
+        for case in cases:
+            print(case.name)
+        return 0
+    if not cases:
+        print("No benchmark cases selected.")
+        return 1
+
+    baseline = harness.load_baseline(args.baseline)
+    differences = harness.environment_differences(baseline)
+    if differences:
+        print(f"Warning: {args.baseline} was recorded on a different machine:")
+        for key, (saved, current) in differences.items():
+            print(f"  {key}: {saved} (baseline) vs {current} (here)")
+        print()
+    print(f"{'Case':<44} {'Best (s)':>10} {'Median (s)':>11} {'Items/s':>14} {'vs base':>8}")
+    print("-" * 91)
+    results = {}
+    for case in cases:
+        result = harness.run_case(case, args.repeat)
+        results[case.name] = result
+        saved = baseline["results"].get(case.name)
+        ratio = f"{result['seconds'] / saved['seconds']:.2f}x" if saved and saved["seconds"] else "-"
+        print(f"{case.name:<44} {result['seconds']:>10.4f} {result['median']:>11.4f} "
+              f"{result['per_second']:>14,.0f} {ratio:>8}", flush=True)
+
+    if args.save:
+        harness.save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if differences and not args.ignore_environment:
+        print("\nSkipped the regression check: the baseline is from a different machine "
+              "(re-record it with --save, or pass --ignore-environment).")
+        return 0
+    regressions = harness.compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.2f}x the baseline:")
+        for name, ratio in regressions.items():
+            print(f"  {name}: {ratio:.2f}x slower")
+        return 1
+    if baseline["results"]:
+        print(f"\nNo regressions beyond {args.threshold:.2f}x the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
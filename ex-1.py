@@ -8,21 +8,70 @@
 
 #import datetime and date module
 from datetime import datetime, date
+from functools import lru_cache
+from itertools import islice
+import argparse
+import csv
+import random
+import sys
+import time
+import numpy as np
+
+import instrumentation
+from instrumentation import metrics
+
+#days in each month of a non-leap year, indexed by month number (index 0 unused)
+DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+#number of distinct date strings remembered by parse_mdy
+PARSE_CACHE_SIZE = 65536
+
+#parse mm/dd/yyyy without strptime, memoizing results because birth dates repeat heavily
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_mdy(date_str: str) -> date | None:
+    '''fast parser for zero-padded mm/dd/yyyy strings
+        return date object if valid, None otherwise (strings without zero padding fall back to strptime)'''
+
+    if len(date_str) == 10 and date_str[2] == "/" and date_str[5] == "/":
+        month, day, year = date_str[0:2], date_str[3:5], date_str[6:10]
+        if date_str.isascii() and (month + day + year).isdigit():
+            try:
+                # date() rejects impossible days such as 02/30 or 02/29 outside leap years
+                return date(int(year), int(month), int(day))
+            except ValueError:
+                return None
+
+    try:
+        return datetime.strptime(date_str, "%m/%d/%Y").date()
+    except ValueError:
+        return None
 
 #base class 
 class AgeCalculator:
     
+    #read today's date once instead of on every call
+    def __init__(self, today: date | None = None):
+        '''store the reference date used for future checks and ages (defaults to today)'''
+        self.today = today or date.today()
+    
     #validate the date format and ensure it's a valid date
     def date_validate(self, date_str: str, date_format: str) -> date | str:
         '''validate the date against mm/dd/yyy format
             return date object if valid, 'format_error' if format is wrong, 'future_error' if date is in future'''
         
+        # mm/dd/yyyy goes through the memoized fast parser, other formats through strptime
+        if date_format == "%m/%d/%Y":
+            birth_date = parse_mdy(date_str)
+            if birth_date is None:
+                return "format_error"
+            return "future_error" if birth_date > self.today else birth_date
+        
         try:
             datetime_obj = datetime.strptime(date_str, date_format)
             birth_date = datetime_obj.date()
             
             # Check if the date is in the future
-            if birth_date > date.today():
+            if birth_date > self.today:
                 return "future_error"
 
             return birth_date
@@ -34,7 +83,7 @@ class AgeCalculator:
     def calculate_age(self, dob: date) -> int:
         '''calculate user age by calculating the difference between today's date and input date'''
 
-        today = date.today()
+        today = self.today
         age = today.year - dob.year
 
         # Adjust age if the birth month and day haven't occurred yet this year
@@ -46,6 +95,121 @@ class AgeCalculator:
     def european_format(self, date_obj: date) -> str:
         '''convert date to European format (dd/mm/yyyy)'''
         return date_obj.strftime("%d/%m/%Y")
+    
+    #validate many birth dates and compute their ages and european dates in one vectorized pass
+    @metrics.timed("ages.batch")
+    def calculate_ages_batch(self, date_strs, today: date | None = None) -> dict:
+        '''parse an array of mm/dd/yyyy strings with numpy and compute every age at once
+            returns a dict of arrays: 'birth_date' (datetime64[D], NaT if invalid), 'age' (-1 if invalid or future),
+            'european' (dd/mm/yyyy, '' if invalid or future) plus boolean masks for format_error and future_error'''
+
+        if today is None:
+            today = self.today
+        dates = np.char.strip(np.asarray(date_strs, dtype=str))
+        count = len(dates)
+
+        # View each zero-padded mm/dd/yyyy string as 10 unicode code points
+        fixed_width = np.char.str_len(dates) == 10
+        codes = dates.astype("U10").view(np.uint32).reshape(count, 10)
+        digits = codes.astype(np.int64) - ord("0")
+        digit_columns = digits[:, [0, 1, 3, 4, 6, 7, 8, 9]]
+
+        month = digits[:, 0] * 10 + digits[:, 1]
+        day = digits[:, 3] * 10 + digits[:, 4]
+        year = digits[:, 6] * 1000 + digits[:, 7] * 100 + digits[:, 8] * 10 + digits[:, 9]
+
+        # Calendar validation, including leap years
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        month_length = DAYS_IN_MONTH[np.clip(month, 0, 12)] + (leap & (month == 2))
+        valid = (
+            fixed_width
+            & (codes[:, 2] == ord("/")) & (codes[:, 5] == ord("/"))
+            & np.all((digit_columns >= 0) & (digit_columns <= 9), axis=1)
+            & (month >= 1) & (month <= 12)
+            & (day >= 1) & (day <= month_length)
+            & (year >= 1)
+        )
+
+        # European format is just the same characters in a different order
+        european = np.ascontiguousarray(codes[:, [3, 4, 2, 0, 1, 5, 6, 7, 8, 9]]).view("U10").ravel()
+
+        # strptime also accepts dates without zero padding (e.g. 1/2/2000); check those one by one
+        for i in np.flatnonzero(~fixed_width):
+            try:
+                dob = datetime.strptime(str(dates[i]), "%m/%d/%Y").date()
+            except ValueError:
+                continue
+            year[i], month[i], day[i] = dob.year, dob.month, dob.day
+            european[i] = self.european_format(dob)
+            valid[i] = True
+
+        # Build datetime64 values from year, month and day offsets
+        birth_date = np.full(count, np.datetime64("NaT"), dtype="datetime64[D]")
+        birth_date[valid] = (
+            (year[valid] - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (month[valid] - 1)
+        ).astype("datetime64[D]") + (day[valid] - 1)
+
+        future = valid & (birth_date > np.datetime64(today))
+        usable = valid & ~future
+
+        # Same rule as calculate_age: subtract one if the birthday hasn't occurred yet this year
+        birthday_pending = (month * 100 + day) > (today.month * 100 + today.day)
+        age = np.where(usable, today.year - year - birthday_pending, -1)
+        european = np.where(usable, european, "")
+
+        return {
+            "birth_date": birth_date,
+            "age": age,
+            "european": european,
+            "format_error": ~valid,
+            "future_error": future,
+        }
+    
+    #non-interactive mode: process a whole file of birth dates chunk by chunk
+    @metrics.timed("ages.stream")
+    def process_stream(self, infile, outfile, rejects, chunk_lines: int = 100_000) -> tuple[int, int]:
+        '''read one mm/dd/yyyy date per line from infile and write "birth_date,age,european_date" csv rows to outfile
+            invalid and future dates go to the rejects sink as csv "line,input,reason" rows; blank lines are skipped
+            only chunk_lines lines are held in memory at a time; return (accepted, rejected) counts'''
+
+        accepted = rejected = 0
+        line_num = 0
+        # Every possible age rendered once, so rows don't pay for int-to-str conversion
+        age_text = np.arange(self.today.year + 1).astype(str)
+        outfile.write("birth_date,age,european_date\n")
+        while True:
+            with metrics.stage("ages.stream.read"):
+                lines = list(islice(infile, chunk_lines))
+            if not lines:
+                break
+            first_line = line_num + 1
+            line_num += len(lines)
+
+            # Each chunk is validated and converted in one vectorized call
+            dates = np.char.strip(np.array(lines, dtype=str))
+            result = self.calculate_ages_batch(dates)
+            blank = dates == ""
+            ok = ~(result["format_error"] | result["future_error"] | blank)
+
+            with metrics.stage("ages.stream.write"):
+                if ok.any():
+                    rows = np.char.add(np.char.add(dates[ok], ","), age_text[result["age"][ok]])
+                    rows = np.char.add(np.char.add(rows, ","), result["european"][ok])
+                    outfile.write("\n".join(rows.tolist()) + "\n")
+                    accepted += int(ok.sum())
+
+                bad = np.flatnonzero(~ok & ~blank)
+                if len(bad):
+                    reasons = np.where(result["future_error"][bad], "future_error", "format_error")
+                    # the input is free text, so it is quoted whenever it holds commas or quotes
+                    csv.writer(rejects, lineterminator="\n").writerows(
+                        (first_line + i, dates[i], reason) for i, reason in zip(bad.tolist(), reasons.tolist())
+                    )
+                    rejected += len(bad)
+
+        metrics.count("ages.accepted", accepted)
+        metrics.count("ages.rejected", rejected)
+        return accepted, rejected
         
 def main():
     '''main loop to get user input and calculate age'''
@@ -54,7 +218,9 @@ def main():
     handler = AgeCalculator()
     while True:
         user = input("PLEASE ENTER YOUR BIRTH DATE IN MM/DD/YYYY FORMAT : ").strip()
-        user_dob = handler.date_validate(user, "%m/%d/%Y")
+        with metrics.stage("ages.validate"):
+            user_dob = handler.date_validate(user, "%m/%d/%Y")
+        metrics.count("ages.attempts")
         
         if user_dob == "format_error":
             print("ERROR, INVALID FORMAT, PLEASE ENTER DATE IN MM/DD/YYYY FORMAT")
@@ -63,11 +229,69 @@ def main():
             print("ERROR, DATE CANNOT BE IN THE FUTURE, PLEASE ENTER A VALID BIRTH DATE")
             continue
 
-        age = handler.calculate_age(user_dob)
+        with metrics.stage("ages.calculate"):
+            age = handler.calculate_age(user_dob)
+            eu_format = handler.european_format(user_dob)
         print(f"YOUR CURRENT AGE IS (YEARS): {age}")
-        eu_format = handler.european_format(user_dob)
         print(f"DATE OF BIRTH IN EUROPEAN FORMAT: {eu_format}")
         break
 
+def benchmark_parse(count: int = 200_000, distinct: int = 5_000):
+    '''time date_validate's old strptime path against the fast parser, with and without memoization'''
+
+    pool = [f"{random.randint(1, 12):02d}/{random.randint(1, 28):02d}/{random.randint(1920, 2020)}"
+            for _ in range(distinct)]
+    dates = [random.choice(pool) for _ in range(count)]
+
+    def strptime_path():
+        for date_str in dates:
+            datetime.strptime(date_str, "%m/%d/%Y").date()
+
+    def uncached_path():
+        for date_str in dates:
+            parse_mdy.__wrapped__(date_str)
+
+    def cached_path():
+        parse_mdy.cache_clear()
+        for date_str in dates:
+            parse_mdy(date_str)
+
+    print(f"PARSING {count} DATES ({distinct} DISTINCT)")
+    print(f"{'PATH':<22} {'SECONDS':>10} {'DATES/SEC':>14}")
+    for name, path in (("strptime", strptime_path), ("fast parser", uncached_path), ("fast parser + cache", cached_path)):
+        start = time.perf_counter()
+        path()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<22} {elapsed:>10.3f} {count / elapsed:>14,.0f}")
+
+def stream_main(input_path: str, output_path: str, rejects_path: str | None):
+    '''run process_stream over files, using '-' for stdin/stdout; rejects default to stderr'''
+
+    handler = AgeCalculator()
+    infile = sys.stdin if input_path == "-" else open(input_path, "r", buffering=1 << 20)
+    outfile = sys.stdout if output_path == "-" else open(output_path, "w", buffering=1 << 20)
+    rejects = sys.stderr if rejects_path is None else open(rejects_path, "w", buffering=1 << 20)
+    try:
+        accepted, rejected = handler.process_stream(infile, outfile, rejects)
+    finally:
+        for stream in (infile, outfile, rejects):
+            if stream not in (sys.stdin, sys.stdout, sys.stderr):
+                stream.close()
+    print(f"PROCESSED {accepted} DATES, REJECTED {rejected}", file=sys.stderr)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Age Calculator")
+    parser.add_argument("--benchmark", action="store_true", help="compare date parsing throughput instead of prompting")
+    parser.add_argument("--input", help="file of mm/dd/yyyy dates, one per line ('-' for stdin); enables batch mode")
+    parser.add_argument("--output", default="-", help="csv output file for batch mode (default: stdout)")
+    parser.add_argument("--rejects", help="file for rejected lines in batch mode (default: stderr)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.session(args):
+        if args.benchmark:
+            benchmark_parse()
+        elif args.input:
+            stream_main(args.input, args.output, args.rejects)
+        else:
+            main()
\ No newline at end of file
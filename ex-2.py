@@ -6,10 +6,396 @@
 # 4. Displays the primes in a formatted output (10 numbers per line) 
 # 5. Handles invalid inputs gracefully
 
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, compress, islice
+from math import isqrt
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; the cache then relies on a single writer
+    fcntl = None
+
+import instrumentation
+from instrumentation import metrics
+
+
+# Number of odd candidates sieved per segment (one byte each, so ~1 MB per segment)
+DEFAULT_SEGMENT_SIZE = 1 << 20
+
+
+def _sieve_flags(limit):
+    """
+    Plain sieve of Eratosthenes up to limit (inclusive).
+    Returns a bytearray where flags[n] is 1 if n is prime.
+    """
+    flags = bytearray(b"\x01") * (limit + 1)
+    flags[0:2] = bytes(min(2, limit + 1))
+    for i in range(2, isqrt(limit) + 1):
+        if flags[i]:
+            # Cross off every multiple of i starting from i*i in one slice assignment
+            flags[i * i::i] = bytes((limit - i * i) // i + 1)
+    return flags
+
+
+def _simple_sieve(limit):
+    """
+    Returns all primes up to limit (inclusive) using a plain sieve of Eratosthenes.
+    Only used for the small base primes (up to sqrt of the range end).
+    """
+    if limit < 2:
+        return []
+    return list(compress(range(limit + 1), _sieve_flags(limit)))
+
+
+# Primes below 100, used to reject most composites before Miller-Rabin
+_SMALL_PRIMES = _simple_sieve(100)
+
+# Below this magnitude trial division is as fast as Miller-Rabin
+_MILLER_RABIN_THRESHOLD = 10_000
+
+# Deterministic Miller-Rabin witness sets: every n below the bound is
+# classified correctly by testing it against the listed bases
+_MILLER_RABIN_WITNESSES = (
+    (2_047, (2,)),
+    (1_373_653, (2, 3)),
+    (25_326_001, (2, 3, 5)),
+    (3_215_031_751, (2, 3, 5, 7)),
+    (2_152_302_898_747, (2, 3, 5, 7, 11)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17)),
+    (3_825_123_056_546_413_051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318_665_857_834_031_151_167_461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+    (3_317_044_064_679_887_385_961_981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)),
+)
+
+
+def _miller_rabin(num):
+    """
+    Miller-Rabin test for an odd num > 41.
+    Deterministic below 3.3 * 10**24 (which covers every 64-bit number);
+    above that the 13-base set only gives a probable-prime answer.
+    """
+    for bound, bases in _MILLER_RABIN_WITNESSES:
+        if num < bound:
+            break
+    
+    # Write num - 1 as d * 2**s with d odd
+    d = num - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    
+    for base in bases:
+        x = pow(base, d, num)
+        if x == 1 or x == num - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % num
+            if x == num - 1:
+                break
+        else:
+            # base is a witness that num is composite
+            return False
+    return True
+
+
+def _segment_bounds(start_num, end_num, segment_size):
+    """
+    Splits [start_num, end_num] into odd-only segments.
+    Yields (low, count) pairs: the segment covers low, low + 2, ..., low + 2 * (count - 1).
+    """
+    low = start_num | 1
+    while low <= end_num:
+        count = min(segment_size, (end_num - low) // 2 + 1)
+        yield low, count
+        low += 2 * count
+
+
+def _sieve_odd_flags(low, count, base_primes):
+    """
+    Sieves count consecutive odd numbers starting at the odd number low.
+    base_primes must hold every odd prime up to sqrt of the segment's last number.
+    Returns a bytearray where flags[i] is 1 if low + 2 * i is prime.
+    """
+    flags = bytearray(b"\x01") * count
+    high = low + 2 * (count - 1)
+    for p in base_primes:
+        square = p * p
+        if square > high:
+            break
+        # First odd multiple of p inside the segment (never p itself)
+        if square >= low:
+            multiple = square
+        else:
+            multiple = (low + p - 1) // p * p
+            if multiple % 2 == 0:
+                multiple += p
+        index = (multiple - low) // 2
+        if index < count:
+            # Consecutive odd multiples of p are 2p apart, i.e. p slots apart
+            flags[index::p] = bytes((count - 1 - index) // p + 1)
+    # 1 is not prime
+    if low == 1:
+        flags[0] = 0
+    return flags
+
+
+# Odd base primes of the current parallel job, installed once per worker process
+_worker_base_primes = None
+
+
+def _init_worker(base_primes):
+    """Process pool initializer: receives the base primes once instead of with every task."""
+    global _worker_base_primes
+    _worker_base_primes = base_primes
+
+
+def _sieve_segment_task(bounds):
+    """Process pool task: sieves one (low, count) segment and returns its primes."""
+    low, count = bounds
+    flags = _sieve_odd_flags(low, count, _worker_base_primes)
+    return list(compress(range(low, low + 2 * count, 2), flags))
+
+
+# Translation tables between one-byte-per-number flags and '0'/'1' bit strings
+_FLAGS_TO_BITS = bytes.maketrans(b"\x00\x01", b"01")
+_BITS_TO_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class PrimeCache:
+    """
+    Persistent odd-only prime bitset, memory-mapped from disk.
+    Bit i of the bitset is set when 2 * i + 1 is prime. The bitset grows in
+    whole blocks, and the companion '.idx' file stores the running count of
+    odd primes at the end of every block, so pi(x) reads at most one block.
+    """
+    
+    MAGIC = b"PRIMEBIT"
+    VERSION = 1
+    HEADER_SIZE = 4096  # one page, so every block starts page-aligned
+    BLOCK_BYTES = 4096
+    BLOCK_BITS = BLOCK_BYTES * 8
+    # Blocks sieved together when the cache is extended (8 MB of flags)
+    EXTEND_BLOCKS = 256
+    
+    def __init__(self, path, max_limit=1 << 32):
+        """
+        Open (or create) the cache file at path.
+        max_limit caps how far the cache may grow; larger ranges are sieved directly.
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        self.max_limit = max_limit
+        self._file = None
+        self._map = None
+        self.block_counts = array("Q")
+        self._open()
+    
+    @property
+    def limit(self):
+        """Largest number the cache can currently answer for."""
+        return 2 * len(self.block_counts) * self.BLOCK_BITS
+    
+    def _open(self):
+        """Open the bitset and index files, creating or repairing them as needed."""
+        header = struct.pack("<8sII", self.MAGIC, self.VERSION, self.BLOCK_BYTES)
+        header = header.ljust(self.HEADER_SIZE, b"\x00")
+        
+        try:
+            # Exclusive create, so two runs starting together do not both write a header
+            with open(self.path, "xb") as file:
+                file.write(header)
+        except FileExistsError:
+            pass
+        
+        self._file = open(self.path, "r+b")
+        with self._locked():
+            if self._file.read(self.HEADER_SIZE) != header:
+                self._file.close()
+                raise ValueError(f"'{self.path}' is not a compatible prime cache file")
+            self._sync()
+        self._remap()
+    
+    @contextmanager
+    def _locked(self):
+        """
+        Hold an exclusive lock on the bitset file, so concurrent runs never repair
+        or extend the cache at the same time. Without fcntl (Windows) this is a no-op.
+        """
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+    
+    def _sync(self):
+        """
+        Reload the index from disk, picking up blocks another run has added.
+        Must be called with the lock held.
+        """
+        self.block_counts = array("Q")
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as index_file:
+                data = index_file.read()
+            self.block_counts.frombytes(data[:len(data) - len(data) % self.block_counts.itemsize])
+        
+        # A run interrupted mid-extension can leave the two files out of step;
+        # keep only the blocks that are present in both
+        bitset_blocks = (os.path.getsize(self.path) - self.HEADER_SIZE) // self.BLOCK_BYTES
+        blocks = min(bitset_blocks, len(self.block_counts))
+        if blocks != len(self.block_counts) or blocks != bitset_blocks or not os.path.exists(self.index_path):
+            del self.block_counts[blocks:]
+            self._file.truncate(self.HEADER_SIZE + blocks * self.BLOCK_BYTES)
+            with open(self.index_path, "wb") as index_file:
+                self.block_counts.tofile(index_file)
+    
+    def _remap(self):
+        """(Re)create the read-only memory map over the whole bitset file."""
+        if self._map is not None:
+            self._map.close()
+        self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def close(self):
+        """Release the memory map and file handle."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def extend(self, limit):
+        """
+        Grow the bitset so that it covers every number up to limit.
+        Only the missing blocks are sieved and appended.
+        """
+        if limit <= self.limit:
+            return
+        if limit > self.max_limit:
+            raise ValueError(f"{limit} is beyond the cache limit of {self.max_limit}")
+        
+        with self._locked():
+            # Another run may have extended the cache while we waited for the lock
+            self._sync()
+            if limit > self.limit:
+                self._append_blocks(limit)
+        self._remap()
+    
+    def _append_blocks(self, limit):
+        """Sieve and append the blocks up to limit; called with the lock held."""
+        first_block = len(self.block_counts)
+        last_block = -(-limit // (2 * self.BLOCK_BITS))  # ceiling division
+        base_primes = _simple_sieve(isqrt(2 * last_block * self.BLOCK_BITS))[1:]
+        running_count = self.block_counts[-1] if self.block_counts else 0
+        
+        self._file.seek(0, os.SEEK_END)
+        with open(self.index_path, "ab") as index_file:
+            for block in range(first_block, last_block, self.EXTEND_BLOCKS):
+                blocks = min(self.EXTEND_BLOCKS, last_block - block)
+                low = 2 * block * self.BLOCK_BITS + 1
+                flags = _sieve_odd_flags(low, blocks * self.BLOCK_BITS, base_primes)
+                
+                counts = array("Q")
+                for i in range(blocks):
+                    running_count += flags.count(1, i * self.BLOCK_BITS, (i + 1) * self.BLOCK_BITS)
+                    counts.append(running_count)
+                
+                # Pack the flags into bits: bit i of the little-endian integer is flags[i]
+                bits = int(flags.translate(_FLAGS_TO_BITS)[::-1], 2)
+                self._file.write(bits.to_bytes(len(flags) // 8, "little"))
+                # The bitset is written before the index, so a crash never indexes missing blocks
+                self._file.flush()
+                counts.tofile(index_file)
+                index_file.flush()
+                self.block_counts.extend(counts)
+    
+    def _count_bits(self, nbits):
+        """Number of set bits among the first nbits bits of the bitset."""
+        block, remainder = divmod(nbits, self.BLOCK_BITS)
+        total = self.block_counts[block - 1] if block else 0
+        if remainder:
+            offset = self.HEADER_SIZE + block * self.BLOCK_BYTES
+            chunk = self._map[offset:offset + (remainder + 7) // 8]
+            total += (int.from_bytes(chunk, "little") & ((1 << remainder) - 1)).bit_count()
+        return total
+    
+    def pi(self, num):
+        """Prime-counting function: number of primes less than or equal to num."""
+        if num < 2:
+            return 0
+        self.extend(num)
+        # 2 plus the odd primes 3..num, i.e. the set bits with index 1..(num - 1) // 2
+        return 1 + self._count_bits((num - 1) // 2 + 1)
+    
+    def count_primes(self, start_num, end_num):
+        """Number of primes in [start_num, end_num], computed as pi(end) - pi(start - 1)."""
+        return self.pi(end_num) - self.pi(start_num - 1)
+    
+    def iter_prime_chunks(self, start_num, end_num, chunk_bytes=1 << 20):
+        """
+        Yields the primes in [start_num, end_num] as lists, reading at most
+        chunk_bytes of the bitset at a time.
+        """
+        if end_num < 2 or start_num > end_num:
+            return
+        self.extend(end_num)
+        if start_num <= 2:
+            yield [2]
+        
+        first_bit = max(start_num, 3) // 2  # index of the first odd number >= start
+        last_bit = (end_num - 1) // 2       # index of the last odd number <= end
+        for chunk_start in range(first_bit - first_bit % 8, last_bit + 1, chunk_bytes * 8):
+            offset = self.HEADER_SIZE + chunk_start // 8
+            chunk = self._map[offset:offset + chunk_bytes]
+            # Unpack the bits back into one flag byte per odd number
+            bits = format(int.from_bytes(chunk, "little"), f"0{len(chunk) * 8}b")
+            flags = bits[::-1].encode().translate(_BITS_TO_FLAGS)
+            
+            lo = max(first_bit, chunk_start)
+            hi = min(last_bit, chunk_start + len(chunk) * 8 - 1)
+            flags = flags[lo - chunk_start:hi - chunk_start + 1]
+            yield list(compress(range(2 * lo + 1, 2 * hi + 2, 2), flags))
+    
+    def primes_in_range(self, start_num, end_num):
+        """Returns a list of the primes in [start_num, end_num] read from the bitset."""
+        primes = []
+        for chunk in self.iter_prime_chunks(start_num, end_num):
+            primes.extend(chunk)
+        return primes
+
 
 class PrimeNumberGen:
     """A class to generate and display prime numbers within a given range."""
     
+    # The cache is grown for a range only if the missing part is at most this many
+    # times the range length
+    CACHE_GROWTH_FACTOR = 4
+    
+    def __init__(self, segment_size=DEFAULT_SEGMENT_SIZE, workers=1, cache_path=None):
+        """
+        Initialize the generator.
+        segment_size is the number of odd candidates held in memory per sieve segment.
+        workers is the number of processes used by the 'parallel' mode (None = all cores).
+        cache_path, if given, is a PrimeCache file reused across runs.
+        """
+        self.segment_size = segment_size
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = PrimeCache(cache_path) if cache_path else None
+    
+    @metrics.timed("primes.validate")
     def validate_ints(self, start_num: int, end_num: int):
         """
         Validates that the input numbers are positive and start is less than end.
@@ -26,6 +412,42 @@ class PrimeNumberGen:
     def is_prime(self, num):
         """
         Checks if a number is prime.
+        Small numbers use trial division; larger ones use a small-prime
+        pre-filter followed by deterministic Miller-Rabin (exact for 64-bit numbers).
+        Returns True if prime, False otherwise.
+        """
+        if num < _MILLER_RABIN_THRESHOLD:
+            return self._is_prime_trial(num)
+        
+        # Most composites have a small factor, which is far cheaper than modular exponentiation
+        for p in _SMALL_PRIMES:
+            if num % p == 0:
+                return False
+        return _miller_rabin(num)
+    
+    @metrics.timed("primes.is_prime_many")
+    def is_prime_many(self, nums):
+        """
+        Checks many numbers at once.
+        Values below the Miller-Rabin threshold are answered from a single sieve
+        shared by the whole batch; the rest go through is_prime.
+        Returns a list of booleans in the same order as nums.
+        """
+        nums = list(nums)
+        small = [num for num in nums if 2 <= num < _MILLER_RABIN_THRESHOLD]
+        flags = _sieve_flags(max(small)) if small else b""
+        
+        results = []
+        for num in nums:
+            if num < _MILLER_RABIN_THRESHOLD:
+                results.append(num >= 2 and flags[num] == 1)
+            else:
+                results.append(self.is_prime(num))
+        return results
+    
+    def _is_prime_trial(self, num):
+        """
+        Checks if a number is prime by trial division up to its square root.
         Returns True if prime, False otherwise.
         """
         # Numbers less than 2 are not prime
@@ -46,40 +468,191 @@ class PrimeNumberGen:
                 return False
         return True
     
-    def find_primes(self, start_num, end_num):
+    def _default_mode(self, start_num, end_num):
+        """
+        Picks the engine for a range: the cache when it already covers the range, or
+        when the part it would have to grow is small next to the range itself
+        (CACHE_GROWTH_FACTOR); otherwise the parallel or serial sieve depending on
+        self.workers. A sparse range far beyond the cache is sieved directly instead
+        of first building the whole bitset up to it.
+        """
+        if self.cache is not None and end_num <= self.cache.max_limit:
+            missing = end_num - self.cache.limit
+            if missing <= 0 or missing <= self.CACHE_GROWTH_FACTOR * (end_num - start_num + 1):
+                return "cache"
+        return "parallel" if self.workers > 1 else "sieve"
+    
+    @metrics.timed("primes.find")
+    def find_primes(self, start_num, end_num, mode=None):
         """
         Finds all prime numbers in the given range (inclusive).
+        mode selects the engine: 'sieve' (segmented sieve), 'parallel' (segmented
+        sieve spread over self.workers processes), 'cache' (persistent bitset)
+        or 'trial' (trial division). By default the fastest available one is used.
         Returns a list of prime numbers.
         """
         primes = []
-        # Loop through each number in the range
-        for num in range(start_num, end_num + 1):
-            if self.is_prime(num):
-                primes.append(num)
+        for chunk in self._iter_prime_chunks(start_num, end_num, mode):
+            primes.extend(chunk)
         return primes
     
-    def display_primes(self, primes):
+    def iter_primes(self, start_num, end_num, mode=None):
+        """
+        Lazily yields the prime numbers in the given range (inclusive), in order.
+        Accepts the same modes as find_primes; only one segment is held in memory at a time.
+        """
+        for chunk in self._iter_prime_chunks(start_num, end_num, mode):
+            yield from chunk
+    
+    def _iter_prime_chunks(self, start_num, end_num, mode=None):
+        """
+        Yields the primes of the range as a sequence of sorted lists, one per segment.
+        This is the common engine behind find_primes, iter_primes and count_primes.
+        """
+        if mode is None:
+            mode = self._default_mode(start_num, end_num)
+        
+        if mode == "cache":
+            if self.cache is None:
+                raise ValueError("The 'cache' mode needs a cache_path")
+            chunks = self.cache.iter_prime_chunks(start_num, end_num)
+        elif mode == "sieve":
+            chunks = self._sieve_chunks(start_num, end_num)
+        elif mode == "parallel":
+            chunks = self._parallel_chunks(start_num, end_num)
+        elif mode == "trial":
+            chunks = self._trial_chunks(start_num, end_num)
+        else:
+            raise ValueError(f"Unknown prime search mode '{mode}'")
+        
+        # Time the engine itself, apart from whoever consumes the primes
+        for chunk in metrics.timed_iter(f"primes.engine.{mode}", chunks):
+            metrics.count("primes.segments")
+            metrics.count("primes.found", len(chunk))
+            yield chunk
+    
+    def _trial_chunks(self, start_num, end_num):
         """
-        Displays the list of prime numbers in a formatted output.
+        Trial division over the range, one segment-sized block at a time.
+        """
+        for block_start in range(start_num, end_num + 1, self.segment_size):
+            block_end = min(block_start + self.segment_size - 1, end_num)
+            yield [num for num in range(block_start, block_end + 1) if self._is_prime_trial(num)]
+    
+    def _sieve_chunks(self, start_num, end_num):
+        """
+        Segmented sieve of Eratosthenes over the odd numbers of the range.
+        Memory use is bounded by segment_size bytes plus the base primes up to sqrt(end_num).
+        """
+        if start_num <= 2 <= end_num:
+            yield [2]
+        if end_num < 3:
+            return
+        
+        # Odd base primes up to sqrt(end_num) are enough to sieve every segment
+        base_primes = _simple_sieve(isqrt(end_num))[1:]
+        for low, count in _segment_bounds(max(start_num, 3), end_num, self.segment_size):
+            flags = _sieve_odd_flags(low, count, base_primes)
+            yield list(compress(range(low, low + 2 * count, 2), flags))
+    
+    def _parallel_chunks(self, start_num, end_num):
+        """
+        Segmented sieve with the segments distributed over a process pool.
+        Results are yielded in segment order, so they come out sorted like the serial ones;
+        at most two segments per worker are in flight at any time.
+        """
+        segments = list(_segment_bounds(max(start_num, 3), end_num, self.segment_size))
+        # A pool only pays off when there is more than one segment to hand out
+        if self.workers <= 1 or len(segments) <= 1:
+            yield from self._sieve_chunks(start_num, end_num)
+            return
+        
+        if start_num <= 2 <= end_num:
+            yield [2]
+        base_primes = _simple_sieve(isqrt(end_num))[1:]
+        workers = min(self.workers, len(segments))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(base_primes,)) as executor:
+            pending = deque()
+            for segment in segments:
+                pending.append(executor.submit(_sieve_segment_task, segment))
+                # Collect in submission order, which keeps the merge sorted
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    @metrics.timed("primes.count")
+    def count_primes(self, start_num, end_num):
+        """
+        Counts the primes in the given range (inclusive).
+        Uses the cache's pi(x) index when available, so no sieving is repeated.
+        """
+        if self._default_mode(start_num, end_num) == "cache":
+            return self.cache.count_primes(start_num, end_num)
+        return sum(len(chunk) for chunk in self._iter_prime_chunks(start_num, end_num))
+    
+    def write_primes(self, primes, sink, per_line=10, lines_per_chunk=10_000):
+        """
+        Streams primes to a file-like sink, per_line numbers per line (6 characters each).
+        Numbers are formatted lines_per_chunk lines at a time and written with a single
+        write call per chunk. The last line is left unterminated if it is not full.
+        Returns the number of primes written.
+        """
+        primes = iter(primes)
+        chunk_size = per_line * lines_per_chunk
+        # printf-style formatting of one big template is the cheapest way to render ints
+        chunk_format = ("%6d" * per_line + "\n") * lines_per_chunk
+        written = 0
+        
+        while True:
+            chunk = list(islice(primes, chunk_size))
+            with metrics.stage("primes.format"):
+                if len(chunk) == chunk_size:
+                    sink.write(chunk_format % tuple(chunk))
+                elif chunk:
+                    # Final partial chunk: full lines plus a possibly incomplete last line
+                    full_lines, remainder = divmod(len(chunk), per_line)
+                    tail_format = ("%6d" * per_line + "\n") * full_lines + "%6d" * remainder
+                    sink.write(tail_format % tuple(chunk))
+            written += len(chunk)
+            if len(chunk) < chunk_size:
+                return written
+    
+    def display_primes(self, primes, count=None, sink=None):
+        """
+        Displays the prime numbers in a formatted output.
         Shows 10 numbers per line.
+        primes may be a list or a lazy iterator such as iter_primes(); when the
+        count is not known up front it is shown after the listing instead.
         """
+        if sink is None:
+            sink = sys.stdout
+        if count is None and hasattr(primes, "__len__"):
+            count = len(primes)
+        
         # Check if any primes were found
-        if not primes:
-            print("No prime numbers found in the given range.")
+        primes = iter(primes)
+        first = next(primes, None)
+        if first is None:
+            sink.write("No prime numbers found in the given range.\n")
             return
         
         # Display header with count
-        print(f"\nFound {len(primes)} prime number(s):")
-        print("-" * 60)
+        if count is not None:
+            sink.write(f"\nFound {count} prime number(s):\n")
+        else:
+            sink.write("\nPrime numbers found:\n")
+        sink.write("-" * 60 + "\n")
+        
+        # Write the primes 10 per line in large buffered chunks
+        written = self.write_primes(chain([first], primes), sink)
+        sink.write("\n")  # Final newline
         
-        # Print each prime number
-        for i, prime in enumerate(primes):
-            print(f"{prime:6}", end="")  # 6-character width for alignment
-            # Print 10 numbers per line
-            if (i + 1) % 10 == 0:
-                print()
-        print()  # Final newline
+        if count is None:
+            sink.write(f"Total: {written} prime number(s).\n")
     
+    @metrics.timed("primes.run")
     def run(self):
         """
         Main method to run the prime number generator program.
@@ -111,8 +684,9 @@ class PrimeNumberGen:
             
             # Find and display primes
             print(f"\nSearching for primes between {start_num} and {end_num}...")
-            primes = self.find_primes(start_num, end_num)
-            self.display_primes(primes)
+            # Stream the primes instead of building the whole list; the cache knows the count up front
+            count = self.count_primes(start_num, end_num) if self._default_mode(start_num, end_num) == "cache" else None
+            self.display_primes(self.iter_primes(start_num, end_num), count=count)
             
         except ValueError:
             # Handle non-integer input
@@ -125,8 +699,69 @@ class PrimeNumberGen:
             print(f"An unexpected error occurred: {e}")
 
 
-if __name__ == "__main__":
+def benchmark(ranges=((1, 10_000), (1, 100_000), (1, 1_000_000), (10**9, 10**9 + 100_000))):
+    """
+    Times the trial-division and sieve engines of find_primes over each range
+    and prints a comparison table.
+    """
     generator = PrimeNumberGen()
-    generator.run()
+    
+    print(f"{'Range':<28} {'Primes':>8} {'Trial (s)':>11} {'Sieve (s)':>11} {'Speedup':>9}")
+    print("-" * 71)
+    for start_num, end_num in ranges:
+        timings = {}
+        for mode in ("trial", "sieve"):
+            began = time.perf_counter()
+            primes = generator.find_primes(start_num, end_num, mode=mode)
+            timings[mode] = time.perf_counter() - began
+        
+        speedup = timings["trial"] / timings["sieve"] if timings["sieve"] else float("inf")
+        print(
+            f"{f'{start_num}-{end_num}':<28} {len(primes):>8} "
+            f"{timings['trial']:>11.4f} {timings['sieve']:>11.4f} {speedup:>8.1f}x"
+        )
+
+
+def benchmark_parallel(start_num=1, end_num=200_000_000, worker_counts=(1, 2, 4, 8)):
+    """
+    Times the parallel engine over one range for each worker count
+    and prints the speedup relative to a single worker.
+    """
+    print(f"Parallel sieve scaling for {start_num}-{end_num} ({os.cpu_count()} CPU(s) available)")
+    print(f"{'Workers':>8} {'Primes':>10} {'Seconds':>10} {'Speedup':>9}")
+    print("-" * 40)
+    baseline = None
+    for workers in worker_counts:
+        generator = PrimeNumberGen(workers=workers)
+        began = time.perf_counter()
+        primes = generator.find_primes(start_num, end_num, mode="parallel")
+        elapsed = time.perf_counter() - began
+        
+        if baseline is None:
+            baseline = elapsed
+        print(f"{workers:>8} {len(primes):>10} {elapsed:>10.3f} {baseline / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prime Number Generator")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare the trial-division and sieve engines instead of prompting")
+    parser.add_argument("--benchmark-parallel", action="store_true",
+                        help="measure parallel sieve scaling for 1, 2, 4 and 8 workers")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes for the sieve (0 = all cores)")
+    parser.add_argument("--cache", metavar="PATH", default=None,
+                        help="prime bitset cache file reused across runs (default: no cache)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    
+    with instrumentation.session(args):
+        if args.benchmark:
+            benchmark()
+        elif args.benchmark_parallel:
+            benchmark_parallel()
+        else:
+            generator = PrimeNumberGen(workers=args.workers, cache_path=args.cache)
+            generator.run()
     
 
@@ -10,25 +10,99 @@
 # 8. Handles all errors gracefully
 
 import numpy as np
+import argparse
+import contextlib
+import csv
+import glob
+import heapq
+import io
+import json
+import locale
 import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; the merge then uses MERGE_FAN_IN as is
+    resource = None
+
+import instrumentation
+from instrumentation import metrics
 
 
 class StudentMarksProcessor:
     """A class to process student marks data and generate grade reports."""
     
-    def __init__(self, exam_weight=0.6, coursework_weight=0.4):
+    # Layout of one processed student record
+    RECORD_DTYPE = [
+        ('reg_number', 'U20'),
+        ('exam_mark', 'f4'),
+        ('coursework_mark', 'f4'),
+        ('overall_mark', 'f4'),
+        ('grade', 'u1')  # index into grade_labels
+    ]
+    
+    # Bytes of input parsed and validated together (rounded up to a whole line)
+    CHUNK_BYTES = 8 << 20
+    
+    # Resolution of the overall-mark histogram used for streaming quantiles (0.01 marks)
+    HISTOGRAM_BINS = 10001
+    
+    # Records buffered across all runs during the external merge
+    MERGE_BUFFER_ROWS = 1 << 20
+    
+    # Most runs merged in one pass; more runs are merged in several passes, keeping the
+    # number of open files well below the usual 1024-descriptor limit
+    MERGE_FAN_IN = 128
+    
+    # Preformatted text for every mark from 0.00 to 100.00, one table per printf pattern
+    _MARK_TEXT_TABLES = {}
+    
+    # Bump whenever the layout of the columnar cache changes
+    CACHE_VERSION = 1
+    
+    # bytes.split() does not treat the ASCII separators \x1c-\x1f as whitespace, str.split() does
+    _SEPARATORS_TO_SPACE = bytes.maketrans(b'\x1c\x1d\x1e\x1f', b'    ')
+    
+    def __init__(self, exam_weight=0.6, coursework_weight=0.4,
+                 grade_boundaries=(40, 50, 60, 70), grade_labels=('F', 'D', 'C', 'B', 'A'),
+                 use_cache=False):
         """
-        Initialize the processor with mark weightings.
+        Initialize the processor with mark weightings and grading rules.
         Default: 60% exam, 40% coursework.
+        grade_boundaries are the ascending lower bounds of every grade but the lowest;
+        grade_labels names the grades from lowest to highest (one more than the boundaries).
+        With use_cache=True, processed data is kept in a binary cache next to each input file.
         """
+        if len(grade_labels) != len(grade_boundaries) + 1:
+            raise ValueError("grade_labels must have exactly one more entry than grade_boundaries")
+        
         self.exam_weight = exam_weight
         self.coursework_weight = coursework_weight
+        self.grade_boundaries = np.asarray(grade_boundaries, dtype=np.float64)
+        self.grade_labels = np.array(grade_labels)
+        self.use_cache = use_cache
         self.students_data = None
+        # Optional row order (descending overall mark) set by a lazy sort
+        self.order = None
+        # reg_number -> row of students_data, built on first lookup (see build_index)
+        self.index = None
+        # Grade counts and exam/coursework/overall mark sums kept up to date by upserts
+        self.totals = None
+        # True while students_data itself is in report order
+        self.is_sorted = False
+        # Spare capacity behind students_data so upserts can append without copying every time
+        self._storage = None
     
+    @metrics.timed("marks.read")
     def read_marks_file(self, filename):
         """
         Reads student marks data from a file.
         Expected format: registration_number exam_mark coursework_mark
+        The file is parsed in large chunks straight into a preallocated structured array.
         Returns True if successful, False otherwise.
         """
         try:
@@ -37,109 +111,503 @@ class StudentMarksProcessor:
                 print(f"Error: File '{filename}' not found!")
                 return False
             
-            # Lists to store data
-            reg_numbers = []
-            exam_marks = []
-            coursework_marks = []
+            # Reuse the processed columns from an earlier run when the file is unchanged
+            if self.use_cache and self.load_cache(filename):
+                print(f"Successfully read {len(self.students_data)} student records (from cache).")
+                metrics.count("marks.cache_hits")
+                metrics.count("marks.records", len(self.students_data))
+                return True
             
-            # Read the file line by line
-            with open(filename, 'r') as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    
-                    # Skip empty lines or comments
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Split the line into parts
-                    parts = line.split()
-                    
-                    if len(parts) != 3:
-                        print(f"Warning: Line {line_num} has invalid format. Skipping...")
-                        continue
-                    
-                    try:
-                        reg_num = parts[0]
-                        exam = float(parts[1])
-                        coursework = float(parts[2])
-                        
-                        # Validate marks are in valid range (0-100)
-                        if not (0 <= exam <= 100 and 0 <= coursework <= 100):
-                            print(f"Warning: Line {line_num} has marks out of range (0-100). Skipping...")
-                            continue
-                        
-                        reg_numbers.append(reg_num)
-                        exam_marks.append(exam)
-                        coursework_marks.append(coursework)
-                        
-                    except ValueError:
-                        print(f"Warning: Line {line_num} has invalid numeric values. Skipping...")
-                        continue
+            with open(filename, 'rb') as file:
+                # Keyed by the file as it was before reading: if it changes while being
+                # parsed, the saved key no longer matches and the next run re-parses it
+                cache_key = self._cache_key(filename, os.fstat(file.fileno()))
+                raw = self._normalise_newlines(file.read())
             
-            if not reg_numbers:
+            # One row per line is an upper bound on the number of records
+            data = np.empty(raw.count(b'\n') + 1, dtype=self.RECORD_DTYPE)
+            count = 0
+            first_line_num = 1
+            start = 0
+            while start < len(raw):
+                # Each chunk runs to the end of the line reaching CHUNK_BYTES
+                end = raw.find(b'\n', start + self.CHUNK_BYTES - 1) + 1 or len(raw)
+                chunk = raw[start:end]
+                start = end
+                written, skipped = self._parse_chunk(chunk, first_line_num, data, count)
+                count += written
+                first_line_num += chunk.count(b'\n')
+                for line_num, problem in skipped:
+                    print(f"Warning: Line {line_num} {problem}. Skipping...")
+                metrics.count("marks.skipped_lines", len(skipped))
+            
+            if count == 0:
                 print("Error: No valid student data found in the file!")
                 return False
             
-            # Calculate overall marks
-            overall_marks = [
-                (exam * self.exam_weight) + (coursework * self.coursework_weight)
-                for exam, coursework in zip(exam_marks, coursework_marks)
-            ]
-            
-            # Assign grades
-            grades = [self.assign_grade(mark) for mark in overall_marks]
-            
-            # Create structured NumPy array
-            self.students_data = np.array(
-                list(zip(reg_numbers, exam_marks, coursework_marks, overall_marks, grades)),
-                dtype=[
-                    ('reg_number', 'U20'),
-                    ('exam_mark', 'f4'),
-                    ('coursework_mark', 'f4'),
-                    ('overall_mark', 'f4'),
-                    ('grade', 'U2')
-                ]
-            )
-            
-            print(f"Successfully read {len(reg_numbers)} student records.")
+            self._set_students_data(data[:count])
+            print(f"Successfully read {count} student records.")
+            metrics.count("marks.records", count)
+            metrics.count("marks.bytes_read", len(raw))
+            
+            if self.use_cache:
+                try:
+                    self.save_cache(filename, cache_key)
+                except OSError as e:
+                    print(f"Warning: Could not write cache for '{filename}': {e}")
             return True
             
         except Exception as e:
             print(f"Error reading file: {e}")
             return False
     
+    def _cache_dir(self, filename):
+        """Directory holding the columnar cache of a marks file."""
+        return filename + ".cache"
+    
+    def _cache_key(self, filename, stat=None):
+        """
+        Everything the cached columns depend on: the source file's size and
+        modification time, the weighting and the grade boundaries.
+        stat is the file's os.stat result if already taken.
+        """
+        if stat is None:
+            stat = os.stat(filename)
+        return {
+            "version": self.CACHE_VERSION,
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "exam_weight": self.exam_weight,
+            "coursework_weight": self.coursework_weight,
+            "grade_boundaries": self.grade_boundaries.tolist(),
+        }
+    
+    def save_cache(self, filename, key=None):
+        """
+        Saves students_data as one .npy file per column plus a meta.json key file.
+        The key is written last, so an interrupted save never looks valid.
+        key is the _cache_key of the file as it was read (default: as it is now).
+        """
+        cache_dir = self._cache_dir(filename)
+        os.makedirs(cache_dir, exist_ok=True)
+        meta_path = os.path.join(cache_dir, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        
+        for name in self.students_data.dtype.names:
+            np.save(os.path.join(cache_dir, f"{name}.npy"), np.ascontiguousarray(self.students_data[name]))
+        
+        meta = dict(key or self._cache_key(filename), rows=len(self.students_data))
+        with open(meta_path + ".tmp", 'w') as file:
+            json.dump(meta, file)
+        os.replace(meta_path + ".tmp", meta_path)
+    
+    def load_cached_column(self, filename, column):
+        """
+        Returns one column of the cache as a read-only memory-mapped array without
+        loading the others, or None if there is no valid cache for the file.
+        """
+        cache_dir = self._cache_dir(filename)
+        try:
+            with open(os.path.join(cache_dir, "meta.json"), 'r') as file:
+                meta = json.load(file)
+            if meta != dict(self._cache_key(filename), rows=meta.get("rows")):
+                return None
+            values = np.load(os.path.join(cache_dir, f"{column}.npy"), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return values if len(values) == meta["rows"] else None
+    
+    def load_cache(self, filename):
+        """
+        Loads students_data from the cache if it matches the current file and settings.
+        Returns True if the cache was used, False otherwise.
+        """
+        columns = {}
+        for name, _ in self.RECORD_DTYPE:
+            values = self.load_cached_column(filename, name)
+            if values is None:
+                return False
+            columns[name] = values
+        
+        data = np.empty(len(columns['reg_number']), dtype=self.RECORD_DTYPE)
+        for name, values in columns.items():
+            data[name] = values
+        self._set_students_data(data)
+        return True
+    
+    def _normalise_newlines(self, raw):
+        """Converts CRLF and lone CR line endings to LF, the way text mode would."""
+        if b'\r' in raw:
+            raw = raw.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        return raw
+    
+    def _iter_file_chunks(self, filename, chunk_bytes):
+        """
+        Reads a file chunk_bytes at a time and yields (chunk, first_line_num) pairs,
+        where every chunk holds whole lines only.
+        """
+        first_line_num = 1
+        carry = b''
+        with open(filename, 'rb') as file:
+            while True:
+                block = file.read(chunk_bytes)
+                data = carry + block
+                if not block:
+                    if data:
+                        yield self._normalise_newlines(data), first_line_num
+                    return
+                
+                # Hold back the trailing partial line for the next chunk
+                cut = data.rfind(b'\n') + 1
+                chunk, carry = data[:cut], data[cut:]
+                if chunk:
+                    chunk = self._normalise_newlines(chunk)
+                    yield chunk, first_line_num
+                    first_line_num += chunk.count(b'\n')
+    
+    @metrics.timed("marks.parse")
+    def _parse_chunk(self, chunk, first_line_num, out, offset):
+        """
+        Parses a chunk of raw bytes made of whole lines into the structured array out,
+        starting at row offset. ASCII chunks are tokenised with vectorized NumPy
+        operations; anything else is decoded and split line by line.
+        Returns (rows_written, skipped), where skipped lists (line_number, problem)
+        pairs in line order.
+        """
+        if not chunk.isascii():
+            lines = chunk.decode(locale.getpreferredencoding(False)).split('\n')
+            return self._parse_lines(lines, first_line_num, out, offset)
+        
+        # str.split() also treats the ASCII separators \x1c-\x1f as whitespace
+        chunk = chunk.translate(self._SEPARATORS_TO_SPACE)
+        buf = np.frombuffer(chunk, dtype=np.uint8)
+        space = (buf == 32) | ((buf >= 9) & (buf <= 13))
+        
+        # A token starts wherever a non-space byte follows a space (or the chunk start)
+        token_starts = np.flatnonzero(~space & np.concatenate(([True], space[:-1])))
+        newlines = np.flatnonzero(buf == 10)
+        line_count = len(newlines) + 1
+        token_lines = np.searchsorted(newlines, token_starts)
+        tokens_per_line = np.bincount(token_lines, minlength=line_count)
+        first_tokens = np.cumsum(tokens_per_line) - tokens_per_line
+        
+        # Skip empty lines or comments
+        has_tokens = tokens_per_line > 0
+        comment = np.zeros(line_count, dtype=bool)
+        comment[has_tokens] = buf[token_starts[first_tokens[has_tokens]]] == ord('#')
+        data_lines = has_tokens & ~comment
+        
+        skipped = [
+            (first_line_num + i, "has invalid format")
+            for i in np.flatnonzero(data_lines & (tokens_per_line != 3)).tolist()
+        ]
+        rows = np.flatnonzero(data_lines & (tokens_per_line == 3))
+        if len(rows) == 0:
+            return 0, skipped
+        
+        # Pick the three fields of every well-formed line out of the flat token list
+        tokens = np.array(chunk.split())
+        first = first_tokens[rows]
+        return self._store_rows(
+            rows + first_line_num, tokens[first], tokens[first + 1], tokens[first + 2],
+            out, offset, skipped
+        )
+    
+    def _parse_lines(self, lines, first_line_num, out, offset):
+        """
+        Line-by-line fallback of _parse_chunk for text that is not plain ASCII.
+        Returns (rows_written, skipped) like _parse_chunk.
+        """
+        skipped = []
+        line_nums = []
+        fields = []
+        
+        for line_num, line in enumerate(lines, first_line_num):
+            parts = line.split()
+            
+            # Skip empty lines or comments
+            if not parts or parts[0].startswith('#'):
+                continue
+            
+            if len(parts) != 3:
+                skipped.append((line_num, "has invalid format"))
+                continue
+            
+            line_nums.append(line_num)
+            fields.append(parts)
+        
+        if not fields:
+            return 0, skipped
+        reg_numbers, exam_texts, coursework_texts = (np.array(column) for column in zip(*fields))
+        return self._store_rows(
+            np.array(line_nums), reg_numbers, exam_texts, coursework_texts,
+            out, offset, skipped
+        )
+    
+    def _store_rows(self, line_nums, reg_numbers, exam_texts, coursework_texts, out, offset, skipped):
+        """
+        Converts and validates whole columns of parsed fields, then writes the valid
+        rows into out starting at row offset. Problems are added to skipped.
+        Returns (rows_written, skipped).
+        """
+        # Convert both mark columns in bulk; unparseable values become NaN
+        exam_marks, exam_ok = self._parse_marks(exam_texts)
+        coursework_marks, coursework_ok = self._parse_marks(coursework_texts)
+        numeric_ok = exam_ok & coursework_ok
+        
+        # Validate marks are in valid range (0-100)
+        in_range = (
+            (exam_marks >= 0) & (exam_marks <= 100) &
+            (coursework_marks >= 0) & (coursework_marks <= 100)
+        )
+        valid = numeric_ok & in_range
+        
+        if not valid.all():
+            skipped.extend((n, "has invalid numeric values") for n in line_nums[~numeric_ok].tolist())
+            skipped.extend((n, "has marks out of range (0-100)") for n in line_nums[numeric_ok & ~in_range].tolist())
+            skipped.sort()
+            exam_marks = exam_marks[valid]
+            coursework_marks = coursework_marks[valid]
+            reg_numbers = reg_numbers[valid]
+        
+        # Calculate overall marks
+        overall_marks = (exam_marks * self.exam_weight) + (coursework_marks * self.coursework_weight)
+        
+        # Fill the preallocated columns directly
+        rows = slice(offset, offset + len(exam_marks))
+        out['reg_number'][rows] = reg_numbers
+        out['exam_mark'][rows] = exam_marks
+        out['coursework_mark'][rows] = coursework_marks
+        out['overall_mark'][rows] = overall_marks
+        out['grade'][rows] = self.assign_grade_codes(overall_marks)
+        return len(exam_marks), skipped
+    
+    def _parse_marks(self, texts):
+        """
+        Converts an array of mark strings to a float64 array.
+        Returns (marks, parsed) where parsed is False for values that are not numbers.
+        """
+        try:
+            marks = texts.astype(np.float64)
+            return marks, np.ones(len(marks), dtype=bool)
+        except ValueError:
+            pass
+        
+        # Slow path for chunks containing bad values: convert one by one
+        marks = np.empty(len(texts), dtype=np.float64)
+        parsed = np.ones(len(texts), dtype=bool)
+        for i, text in enumerate(texts.tolist()):
+            try:
+                marks[i] = float(text)
+            except ValueError:
+                marks[i] = np.nan
+                parsed[i] = False
+        return marks, parsed
+    
     def assign_grade(self, overall_mark):
         """
         Assigns a grade based on the overall mark.
-        Grading rules:
+        Default grading rules:
         - A: 70 and above
         - B: 60-69
         - C: 50-59
         - D: 40-49
         - F: Below 40
         """
-        if overall_mark >= 70:
-            return 'A'
-        elif overall_mark >= 60:
-            return 'B'
-        elif overall_mark >= 50:
-            return 'C'
-        elif overall_mark >= 40:
-            return 'D'
-        else:
-            return 'F'
+        return str(self.grade_labels[self.assign_grade_codes(overall_mark)])
+    
+    @metrics.timed("marks.grade")
+    def assign_grade_codes(self, overall_marks):
+        """
+        Assigns grades to a whole array of overall marks in one vectorized pass.
+        Returns uint8 codes indexing self.grade_labels.
+        """
+        # digitize returns how many boundaries each mark has reached
+        return np.digitize(overall_marks, self.grade_boundaries).astype(np.uint8)
     
-    def sort_by_overall_mark(self):
+    @metrics.timed("marks.sort")
+    def sort_by_overall_mark(self, lazy=False):
         """
         Sorts students by overall mark in descending order.
+        With lazy=True the records are left in place and only self.order, an index
+        array computed from the overall_mark column alone, is set; students with
+        equal marks then keep their input order.
         """
         if self.students_data is not None:
+            if lazy:
+                self.order = np.argsort(-self.students_data['overall_mark'], kind='stable')
+                return
             # Sort in descending order (highest marks first)
-            self.students_data = np.sort(self.students_data, order='overall_mark')[::-1]
+            self._set_students_data(np.sort(self.students_data, order='overall_mark')[::-1])
+            self.is_sorted = True
+    
+    def _set_students_data(self, data):
+        """
+        Replaces students_data, dropping everything derived from the old row layout.
+        """
+        self.students_data = data
+        self.order = None
+        self.index = None
+        self.totals = None
+        self.is_sorted = False
+        self._storage = None
+    
+    def build_index(self):
+        """
+        Builds the reg_number index and the running grade/mark totals.
+        A registration number appearing more than once maps to its first row.
+        """
+        reg_numbers = self.students_data['reg_number'].tolist()
+        # Insert in reverse so the first occurrence wins
+        self.index = dict(zip(reversed(reg_numbers), range(len(reg_numbers) - 1, -1, -1)))
+        
+        counts = np.bincount(self.students_data['grade'], minlength=len(self.grade_labels))
+        sums = np.array([np.sum(self.students_data[field], dtype=np.float64)
+                         for field in ('exam_mark', 'coursework_mark', 'overall_mark')])
+        self.totals = (counts, sums)
+    
+    def find_student(self, reg_number):
+        """
+        Returns the record for reg_number (a copy), or None if it is not found.
+        """
+        if self.students_data is None:
+            return None
+        if self.index is None:
+            self.build_index()
+        row = self.index.get(reg_number)
+        return None if row is None else self.students_data[row].copy()
+    
+    def upsert_student(self, reg_number, exam_mark, coursework_mark):
+        """
+        Corrects the marks of an existing student or adds a new one.
+        Only that student is re-graded; the index, running totals and report order
+        are updated in place instead of being rebuilt.
+        Returns True if successful, False if the marks are invalid.
+        """
+        try:
+            exam_mark = float(exam_mark)
+            coursework_mark = float(coursework_mark)
+        except (TypeError, ValueError):
+            print(f"Error: Invalid marks for '{reg_number}'!")
+            return False
+        if not (0 <= exam_mark <= 100 and 0 <= coursework_mark <= 100):
+            print(f"Error: Marks for '{reg_number}' are out of range (0-100)!")
+            return False
+        
+        if self.students_data is None:
+            self._set_students_data(np.empty(0, dtype=self.RECORD_DTYPE))
+        if self.index is None:
+            self.build_index()
+        counts, sums = self.totals
+        
+        overall_mark = exam_mark * self.exam_weight + coursework_mark * self.coursework_weight
+        record = np.array([(reg_number, exam_mark, coursework_mark, overall_mark,
+                            self.assign_grade_codes(overall_mark))], dtype=self.RECORD_DTYPE)[0]
+        
+        row = self.index.get(reg_number)
+        if row is None:
+            row = self._append_record(record)
+            self.index[reg_number] = row
+        else:
+            old = self.students_data[row]
+            counts[old['grade']] -= 1
+            sums -= [old['exam_mark'], old['coursework_mark'], old['overall_mark']]
+            self.students_data[row] = record
+        
+        counts[record['grade']] += 1
+        sums += [record['exam_mark'], record['coursework_mark'], record['overall_mark']]
+        
+        if self.order is not None or self.is_sorted:
+            self._reposition(row)
+        return True
+    
+    def _append_record(self, record):
+        """
+        Appends one record to students_data, doubling the spare capacity when it runs out.
+        Returns the new row number.
+        """
+        count = len(self.students_data)
+        if self._storage is None or count == len(self._storage):
+            storage = np.empty(max(16, 2 * count), dtype=self.RECORD_DTYPE)
+            storage[:count] = self.students_data
+            self._storage = storage
+        self._storage[count] = record
+        self.students_data = self._storage[:count + 1]
+        return count
+    
+    def _reposition(self, row):
+        """
+        Moves one changed row to its place in the report order (self.order).
+        A sorted students_data is first given an identity order, so no records move.
+        """
+        if self.order is None:
+            # Every other row is still in sorted position; row itself is placed below
+            order = np.delete(np.arange(len(self.students_data)), row)
+            self.is_sorted = False
+        else:
+            order = self.order[self.order != row]
+        overall_marks = self.students_data['overall_mark']
+        # Equal marks keep their place ahead of the changed student
+        position = np.searchsorted(-overall_marks[order], -overall_marks[row], side='right')
+        self.order = np.insert(order, position, row)
+    
+    def ordered_blocks(self, block_rows=65536):
+        """
+        Yields the student records in report order, block_rows at a time.
+        Uses self.order when a lazy sort has been done, so only one block is copied at once.
+        """
+        for start in range(0, len(self.students_data), block_rows):
+            if self.order is None:
+                yield self.students_data[start:start + block_rows]
+            else:
+                yield self.students_data[self.order[start:start + block_rows]]
+    
+    def top_k(self, k):
+        """
+        Returns the k students with the highest overall marks, best first.
+        Uses argpartition on the overall_mark column, so only k records are sorted.
+        """
+        if self.students_data is None or k <= 0:
+            return None
+        overall_marks = self.students_data['overall_mark']
+        k = min(k, len(overall_marks))
+        
+        best = np.argpartition(-overall_marks, k - 1)[:k]
+        best = best[np.argsort(-overall_marks[best], kind='stable')]
+        return self.students_data[best]
+    
+    def percentile_rank(self, overall_mark):
+        """
+        Returns the percentage of students whose overall mark is below overall_mark.
+        """
+        if self.students_data is None:
+            return None
+        below = np.count_nonzero(self.students_data['overall_mark'] < overall_mark)
+        return below / len(self.students_data) * 100
+    
+    def rank_of(self, reg_number):
+        """
+        Returns the 1-based rank of a student by overall mark (students with equal
+        marks share a rank), or None if the registration number is not found.
+        """
+        if self.students_data is None:
+            return None
+        if self.index is None:
+            self.build_index()
+        row = self.index.get(reg_number)
+        if row is None:
+            return None
+        
+        overall_marks = self.students_data['overall_mark']
+        return int(np.count_nonzero(overall_marks > overall_marks[row])) + 1
     
-    def write_results(self, output_filename):
+    @metrics.timed("marks.write")
+    def write_results(self, output_filename, output_format='text'):
         """
         Writes the processed results to an output file.
+        output_format is 'text' (the formatted report), 'csv', or 'npz' (the sorted
+        structured array plus the grade label table, for np.load).
         Returns True if successful, False otherwise.
         """
         try:
@@ -147,36 +615,116 @@ class StudentMarksProcessor:
                 print("Error: No data to write!")
                 return False
             
-            with open(output_filename, 'w') as file:
-                # Write header
-                file.write("=" * 80 + "\n")
-                file.write("STUDENT MARKS REPORT\n")
-                file.write("=" * 80 + "\n\n")
-                file.write(f"Weighting: Exam {self.exam_weight*100:.0f}%, Coursework {self.coursework_weight*100:.0f}%\n\n")
-                
-                # Write column headers
-                file.write(f"{'Reg Number':<15} {'Exam':<8} {'Coursework':<12} {'Overall':<10} {'Grade':<5}\n")
-                file.write("-" * 80 + "\n")
-                
-                # Write student data
-                for student in self.students_data:
-                    file.write(
-                        f"{student['reg_number']:<15} "
-                        f"{student['exam_mark']:<8.2f} "
-                        f"{student['coursework_mark']:<12.2f} "
-                        f"{student['overall_mark']:<10.2f} "
-                        f"{student['grade']:<5}\n"
-                    )
-                
-                file.write("\n" + "=" * 80 + "\n")
+            if output_format == 'text':
+                with open(output_filename, 'w') as file:
+                    self._write_report_header(file)
+                    for records in self.ordered_blocks():
+                        self._write_report_rows(file, records)
+                    self._write_report_footer(file)
+            elif output_format == 'csv':
+                with open(output_filename, 'w', newline='') as file:
+                    file.write("reg_number,exam_mark,coursework_mark,overall_mark,grade\n")
+                    for records in self.ordered_blocks():
+                        self._write_csv_rows(file, records)
+            elif output_format == 'npz':
+                # Given a path, np.savez would append '.npz' to names without it
+                with open(output_filename, 'wb') as file:
+                    np.savez(file, students=np.concatenate(list(self.ordered_blocks())),
+                             grade_labels=self.grade_labels)
+            else:
+                print(f"Error: Unknown output format '{output_format}'!")
+                return False
             
             print(f"Results written to '{output_filename}' successfully.")
+            metrics.count("marks.rows_written", len(self.students_data))
             return True
             
         except Exception as e:
             print(f"Error writing to file: {e}")
             return False
     
+    def _write_report_header(self, file):
+        """Writes the report title, weighting and column headers."""
+        file.write("=" * 80 + "\n")
+        file.write("STUDENT MARKS REPORT\n")
+        file.write("=" * 80 + "\n\n")
+        file.write(f"Weighting: Exam {self.exam_weight*100:.0f}%, Coursework {self.coursework_weight*100:.0f}%\n\n")
+        
+        # Write column headers
+        file.write(f"{'Reg Number':<15} {'Exam':<8} {'Coursework':<12} {'Overall':<10} {'Grade':<5}\n")
+        file.write("-" * 80 + "\n")
+    
+    def _format_marks(self, marks, pattern):
+        """
+        Formats a whole column of marks with a printf pattern such as '%-8.2f '.
+        Marks are looked up in a table holding every 0.01 step from 0 to 100; the few
+        values the table can't represent exactly (outside 0-100, negative zero, or
+        too close to a rounding boundary) are formatted one by one, so the result
+        always equals pattern % mark.
+        """
+        table = self._MARK_TEXT_TABLES.get(pattern)
+        if table is None:
+            table = np.array([pattern % (cents / 100) for cents in range(10001)])
+            self._MARK_TEXT_TABLES[pattern] = table
+        
+        scaled = marks.astype(np.float64) * 100
+        cents = np.floor(scaled + 0.5)
+        exact = (
+            (cents >= 0) & (cents <= 10000) & ~np.signbit(scaled) &
+            (np.abs(scaled - np.floor(scaled) - 0.5) > 1e-6)
+        )
+        text = table[np.where(exact, cents, 0).astype(np.intp)]
+        
+        inexact = np.flatnonzero(~exact)
+        if len(inexact):
+            fallback = [pattern % mark for mark in marks[inexact].tolist()]
+            text = text.astype(f"U{max(text.dtype.itemsize // 4, max(map(len, fallback)))}")
+            text[inexact] = fallback
+        return text
+    
+    def _write_report_rows(self, file, records):
+        """
+        Writes one report line per student record.
+        Whole columns are formatted at once and the block is written with a single call.
+        """
+        if len(records) == 0:
+            return
+        
+        lines = np.char.add(np.char.ljust(records['reg_number'], 15), " ")
+        lines = np.char.add(lines, self._format_marks(records['exam_mark'], "%-8.2f "))
+        lines = np.char.add(lines, self._format_marks(records['coursework_mark'], "%-12.2f "))
+        lines = np.char.add(lines, self._format_marks(records['overall_mark'], "%-10.2f "))
+        grade_text = np.char.add(np.char.ljust(self.grade_labels, 5), "\n")
+        lines = np.char.add(lines, grade_text[records['grade']])
+        file.write("".join(lines.tolist()))
+    
+    def _write_csv_rows(self, file, records):
+        """Writes student records as CSV lines, formatting whole columns at once."""
+        if len(records) == 0:
+            return
+        
+        reg_numbers = records['reg_number']
+        # Registration numbers that need CSV quoting go through the csv module instead
+        if np.any(np.char.find(reg_numbers, ',') >= 0) or np.any(np.char.find(reg_numbers, '"') >= 0):
+            writer = csv.writer(file, lineterminator="\n")
+            for student in records.tolist():
+                reg_number, exam_mark, coursework_mark, overall_mark, grade = student
+                writer.writerow([reg_number, f"{exam_mark:.2f}", f"{coursework_mark:.2f}",
+                                 f"{overall_mark:.2f}", self.grade_labels[grade]])
+            return
+        
+        lines = np.char.add(reg_numbers, ",")
+        lines = np.char.add(lines, self._format_marks(records['exam_mark'], "%.2f,"))
+        lines = np.char.add(lines, self._format_marks(records['coursework_mark'], "%.2f,"))
+        lines = np.char.add(lines, self._format_marks(records['overall_mark'], "%.2f,"))
+        lines = np.char.add(lines, np.char.add(self.grade_labels, "\n")[records['grade']])
+        file.write("".join(lines.tolist()))
+    
+    def _write_report_footer(self, file):
+        """Writes the closing rule of the report."""
+        file.write("\n" + "=" * 80 + "\n")
+    
+    @metrics.timed("marks.statistics")
     def display_statistics(self):
         """
         Displays grade statistics including count and percentage for each grade.
@@ -185,39 +733,383 @@ class StudentMarksProcessor:
             print("Error: No data available for statistics!")
             return
         
+        # Running totals are kept up to date by upsert_student
+        if self.totals is not None:
+            counts, sums = self.totals
+            self._print_statistics(counts, sums / max(len(self.students_data), 1))
+            return
+        
+        # Count every grade with a single pass over the grade codes
+        counts = np.bincount(self.students_data['grade'], minlength=len(self.grade_labels))
+        
+        # Calculate average marks
+        avg_exam = np.mean(self.students_data['exam_mark'])
+        avg_coursework = np.mean(self.students_data['coursework_mark'])
+        avg_overall = np.mean(self.students_data['overall_mark'])
+        
+        self._print_statistics(counts, (avg_exam, avg_coursework, avg_overall))
+    
+    def _print_statistics(self, counts, averages, quantiles=None):
+        """
+        Prints the grade table and average marks.
+        counts holds one entry per grade code; averages is (exam, coursework, overall);
+        quantiles optionally maps a label such as 'Median' to an overall mark.
+        """
+        total_students = int(np.sum(counts))
+        
         print("\n" + "=" * 60)
         print("GRADE STATISTICS")
         print("=" * 60)
         
-        # Count grades
-        grades = ['A', 'B', 'C', 'D', 'F']
-        total_students = len(self.students_data)
-        
         print(f"\nTotal Students: {total_students}\n")
         print(f"{'Grade':<10} {'Count':<10} {'Percentage':<15}")
         print("-" * 60)
         
-        for grade in grades:
-            count = np.sum(self.students_data['grade'] == grade)
+        # Highest grade first
+        for code in range(len(self.grade_labels) - 1, -1, -1):
+            grade, count = self.grade_labels[code], counts[code]
             percentage = (count / total_students * 100) if total_students > 0 else 0
             print(f"{grade:<10} {count:<10} {percentage:<15.2f}%")
         
-        # Calculate and display average marks
-        avg_exam = np.mean(self.students_data['exam_mark'])
-        avg_coursework = np.mean(self.students_data['coursework_mark'])
-        avg_overall = np.mean(self.students_data['overall_mark'])
-        
+        # Display average marks
+        avg_exam, avg_coursework, avg_overall = averages
         print("\n" + "-" * 60)
         print("\nAVERAGE MARKS")
         print("-" * 60)
         print(f"Average Exam Mark:       {avg_exam:.2f}")
         print(f"Average Coursework Mark: {avg_coursework:.2f}")
         print(f"Average Overall Mark:    {avg_overall:.2f}")
+        
+        if quantiles:
+            print("\n" + "-" * 60)
+            print("\nOVERALL MARK QUANTILES")
+            print("-" * 60)
+            for label, mark in quantiles.items():
+                print(f"{label + ':':<25}{mark:.2f}")
+        print("\n" + "=" * 60)
+    
+    def evaluate_weightings(self, scenarios):
+        """
+        Evaluates several weighting scenarios on the loaded data in one pass.
+        scenarios is a sequence of (exam_weight, coursework_weight) pairs.
+        Returns a dict with:
+        - 'overall_marks': (students x scenarios) matrix of overall marks
+        - 'grade_counts': (scenarios x grades) counts, columns indexed like grade_labels
+        - 'grade_changes': per scenario, how many students get a different grade
+          than under the current weighting
+        Returns None if no data is loaded.
+        """
+        if self.students_data is None:
+            print("Error: No data available for evaluation!")
+            return None
+        
+        weights = np.asarray(scenarios, dtype=np.float64)
+        if weights.ndim != 2 or weights.shape[1] != 2:
+            raise ValueError("scenarios must be a sequence of (exam_weight, coursework_weight) pairs")
+        
+        # The (students x 2) marks matrix times the (2 x scenarios) weight matrix, written
+        # out so every entry is computed exactly like read_marks_file computes overall marks
+        exam_marks = self._stored_marks_as_float64('exam_mark')[:, np.newaxis]
+        coursework_marks = self._stored_marks_as_float64('coursework_mark')[:, np.newaxis]
+        overall_marks = (exam_marks * weights[:, 0]) + (coursework_marks * weights[:, 1])
+        
+        # Grade every student under every scenario, then count all scenarios with one bincount
+        codes = self.assign_grade_codes(overall_marks)
+        grade_total = len(self.grade_labels)
+        scenario_offsets = np.arange(len(weights)) * grade_total
+        grade_counts = np.bincount(
+            (codes + scenario_offsets).ravel(), minlength=len(weights) * grade_total
+        ).reshape(len(weights), grade_total)
+        grade_changes = np.count_nonzero(codes != self.students_data['grade'][:, np.newaxis], axis=0)
+        
+        return {
+            'overall_marks': overall_marks,
+            'grade_counts': grade_counts,
+            'grade_changes': grade_changes,
+        }
+    
+    def _stored_marks_as_float64(self, column):
+        """
+        Returns a float32 mark column as the float64 values it was parsed from.
+        Below 128 float32 is accurate to within 4e-6, so rounding to 5 decimals
+        restores any mark written with up to 5 decimals exactly.
+        """
+        return np.round(self.students_data[column].astype(np.float64), 5)
+    
+    def display_weighting_comparison(self, scenarios):
+        """
+        Prints the grade distribution of every weighting scenario side by side.
+        """
+        results = self.evaluate_weightings(scenarios)
+        if results is None:
+            return
+        
         print("\n" + "=" * 60)
+        print("WEIGHTING COMPARISON")
+        print("=" * 60)
+        
+        # Highest grade first, as in display_statistics
+        codes = range(len(self.grade_labels) - 1, -1, -1)
+        header = "".join(f"{self.grade_labels[code]:<8}" for code in codes)
+        print(f"{'Exam/Coursework':<18} {header}{'Changed':<10}")
+        print("-" * 60)
+        for (exam_weight, coursework_weight), counts, changed in zip(
+                scenarios, results['grade_counts'], results['grade_changes']):
+            split = f"{exam_weight*100:.0f}% / {coursework_weight*100:.0f}%"
+            row = "".join(f"{counts[code]:<8}" for code in codes)
+            print(f"{split:<18} {row}{changed:<10}")
+        print("=" * 60)
+    
+    @metrics.timed("marks.batch")
+    def process_batch(self, inputs, output_dir, workers=None, output_format='text'):
+        """
+        Processes many marks files in a process pool and writes one results file per
+        input into output_dir. inputs is a directory (every *.txt file in it) or a
+        glob pattern. Each worker reads, sorts and writes its file with this
+        processor's settings; the per-file statistics are then merged into one
+        combined summary. Results files keep the inputs' paths relative to their
+        common directory (terms/a/marks.txt -> output_dir/a/marks_results.txt).
+        workers is the number of processes (None or 0 = all cores).
+        Returns True if every file was processed successfully, False otherwise.
+        """
+        try:
+            extensions = {'text': 'txt', 'csv': 'csv', 'npz': 'npz'}
+            if output_format not in extensions:
+                print(f"Error: Unknown output format '{output_format}'!")
+                return False
+            if workers is not None and workers <= 0:
+                workers = None
+            
+            pattern = os.path.join(inputs, "*.txt") if os.path.isdir(inputs) else inputs
+            input_files = sorted(glob.glob(pattern))
+            if not input_files:
+                print(f"Error: No input files match '{inputs}'!")
+                return False
+            os.makedirs(output_dir, exist_ok=True)
+            
+            extension = extensions[output_format]
+            settings = {
+                'exam_weight': self.exam_weight,
+                'coursework_weight': self.coursework_weight,
+                'grade_boundaries': self.grade_boundaries.tolist(),
+                'grade_labels': self.grade_labels.tolist(),
+                'use_cache': self.use_cache,
+            }
+            # Output paths mirror the inputs' paths below their common directory, so
+            # terms/*/marks.txt gives one results file per term instead of one shared file
+            root = os.path.commonpath([os.path.dirname(os.path.abspath(input_file)) for input_file in input_files])
+            output_files = []
+            # Inputs differing only in extension (marks.txt, marks.csv) would still share one
+            sources = {}
+            for input_file in input_files:
+                stem = os.path.splitext(os.path.relpath(os.path.abspath(input_file), root))[0]
+                output_file = os.path.join(output_dir, f"{stem}_results.{extension}")
+                output_files.append(output_file)
+                key = os.path.normcase(output_file)
+                if key in sources:
+                    print(f"Error: '{sources[key]}' and '{input_file}' would both be written to '{output_file}'!")
+                    return False
+                sources[key] = input_file
+            for output_file in output_files:
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            tasks = [(input_file, output_file, output_format, settings)
+                     for input_file, output_file in zip(input_files, output_files)]
+            
+            if workers == 1:
+                results = [_process_batch_file(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(_process_batch_file, tasks))
+            
+            # Merge the per-file statistics
+            counts = np.zeros(len(self.grade_labels), dtype=np.int64)
+            sums = np.zeros(3, dtype=np.float64)
+            failed = 0
+            for result in results:
+                print(f"\n--- {result['input']} ---")
+                print(result['log'], end="")
+                if not result['ok']:
+                    failed += 1
+                    continue
+                counts += result['counts']
+                sums += result['sums']
+            
+            total_students = int(counts.sum())
+            print(f"\nProcessed {len(results) - failed} of {len(results)} file(s), {total_students} student records.")
+            if total_students:
+                self._print_statistics(counts, sums / total_students)
+            return failed == 0
+            
+        except Exception as e:
+            print(f"Error processing batch: {e}")
+            return False
     
-    def run(self):
+    @metrics.timed("marks.chunked")
+    def process_large_file(self, input_filename, output_filename, chunk_bytes=CHUNK_BYTES, temp_dir=None,
+                           output_format='text'):
+        """
+        Out-of-core alternative to read/sort/write/display for files too large for memory.
+        The input is streamed chunk_bytes at a time: statistics are accumulated
+        incrementally (quantiles from a fixed histogram), each chunk is sorted and
+        spilled to disk as a run, and the report is produced by merging the runs.
+        Memory use is bounded by the chunk size, independent of the file size.
+        output_format is 'text' or 'csv' (see write_results).
+        Returns True if successful, False otherwise.
+        """
+        try:
+            if output_format not in ('text', 'csv'):
+                print(f"Error: Output format '{output_format}' is not supported in chunked mode!")
+                return False
+            if not os.path.exists(input_filename):
+                print(f"Error: File '{input_filename}' not found!")
+                return False
+            
+            counts = np.zeros(len(self.grade_labels), dtype=np.int64)
+            sums = np.zeros(3, dtype=np.float64)
+            histogram = np.zeros(self.HISTOGRAM_BINS, dtype=np.int64)
+            
+            with tempfile.TemporaryDirectory(dir=temp_dir) as run_dir:
+                runs = []
+                for chunk, first_line_num in self._iter_file_chunks(input_filename, chunk_bytes):
+                    records = np.empty(chunk.count(b'\n') + 1, dtype=self.RECORD_DTYPE)
+                    count, skipped = self._parse_chunk(chunk, first_line_num, records, 0)
+                    for line_num, problem in skipped:
+                        print(f"Warning: Line {line_num} {problem}. Skipping...")
+                    if count == 0:
+                        continue
+                    records = records[:count]
+                    
+                    # Incremental statistics
+                    counts += np.bincount(records['grade'], minlength=len(self.grade_labels))
+                    for i, field in enumerate(('exam_mark', 'coursework_mark', 'overall_mark')):
+                        sums[i] += np.sum(records[field], dtype=np.float64)
+                    bins = np.floor(records['overall_mark'].astype(np.float64) * 100).astype(np.intp)
+                    histogram += np.bincount(np.clip(bins, 0, self.HISTOGRAM_BINS - 1),
+                                             minlength=self.HISTOGRAM_BINS)
+                    
+                    # Spill the chunk as a sorted run (same order as sort_by_overall_mark)
+                    run_path = os.path.join(run_dir, f"run{len(runs):06d}.npy")
+                    np.save(run_path, np.sort(records, order='overall_mark')[::-1])
+                    runs.append(run_path)
+                
+                total_students = int(counts.sum())
+                if total_students == 0:
+                    print("Error: No valid student data found in the file!")
+                    return False
+                print(f"Successfully read {total_students} student records in {len(runs)} sorted run(s).")
+                
+                with open(output_filename, 'w', newline='') as file:
+                    if output_format == 'text':
+                        self._write_report_header(file)
+                        self._merge_runs(runs, file, self._write_report_rows)
+                        self._write_report_footer(file)
+                    else:
+                        file.write("reg_number,exam_mark,coursework_mark,overall_mark,grade\n")
+                        self._merge_runs(runs, file, self._write_csv_rows)
+            
+            print(f"Results written to '{output_filename}' successfully.")
+            
+            # Histogram quantiles are accurate to the 0.01-mark bin width
+            cumulative = np.cumsum(histogram)
+            quantiles = {
+                label: np.searchsorted(cumulative, fraction * total_students) / 100
+                for label, fraction in (("Lower Quartile", 0.25), ("Median", 0.5), ("Upper Quartile", 0.75))
+            }
+            self._print_statistics(counts, sums / total_students, quantiles)
+            return True
+            
+        except Exception as e:
+            print(f"Error processing file: {e}")
+            return False
+    
+    def _merge_runs(self, runs, file, write_rows):
+        """
+        k-way merges the sorted run files and passes the records to write_rows in
+        blocks, in order.
+        Each run is memory-mapped and read in small blocks, so memory stays bounded
+        however many runs there are. At most _merge_fan_in() runs are open at once:
+        beyond that, groups of runs are first merged into intermediate run files
+        (deleting their inputs), as many passes as needed.
+        """
+        fan_in = self._merge_fan_in()
+        merge_pass = 0
+        while len(runs) > fan_in:
+            merged = []
+            for group_start in range(0, len(runs), fan_in):
+                group = runs[group_start:group_start + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                path = os.path.join(os.path.dirname(group[0]),
+                                    f"merge{merge_pass:02d}_{group_start // fan_in:06d}.npy")
+                merged.append(self._merge_to_run(group, path))
+                for run_path in group:
+                    os.remove(run_path)
+            runs = merged
+            merge_pass += 1
+        
+        for block in self._merge_blocks(runs):
+            write_rows(file, block)
+    
+    def _merge_fan_in(self):
+        """
+        Runs merged per pass: MERGE_FAN_IN, lowered to leave room under a small
+        open-file limit where the platform reports one.
+        """
+        if resource is None:
+            return self.MERGE_FAN_IN
+        soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        if soft_limit == resource.RLIM_INFINITY:
+            return self.MERGE_FAN_IN
+        return max(2, min(self.MERGE_FAN_IN, soft_limit // 2))
+    
+    def _merge_to_run(self, runs, path):
+        """
+        Merges sorted run files into one new sorted run file at path.
+        Returns path.
+        """
+        # Loading a run memory-mapped reads only its header; the mapping closes right away
+        total = sum(len(np.load(run_path, mmap_mode='r')) for run_path in runs)
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=self.RECORD_DTYPE, shape=(total,))
+        position = 0
+        for block in self._merge_blocks(runs):
+            out[position:position + len(block)] = block
+            position += len(block)
+        out.flush()
+        del out
+        return path
+    
+    def _merge_blocks(self, runs):
+        """
+        Yields the records of the sorted run files in merged order, as structured
+        arrays of a few thousand records each.
+        """
+        block_rows = max(256, self.MERGE_BUFFER_ROWS // max(len(runs), 1))
+        
+        def read_run(path):
+            run = np.load(path, mmap_mode='r')
+            for start in range(0, len(run), block_rows):
+                yield from run[start:start + block_rows].tolist()
+        
+        # Runs are sorted on all fields, overall mark first, in descending order
+        def merge_key(record):
+            reg_number, exam_mark, coursework_mark, overall_mark, grade = record
+            return overall_mark, reg_number, exam_mark, coursework_mark, grade
+        
+        buffer = []
+        for record in heapq.merge(*(read_run(path) for path in runs), key=merge_key, reverse=True):
+            buffer.append(record)
+            if len(buffer) == block_rows:
+                yield np.array(buffer, dtype=self.RECORD_DTYPE)
+                buffer.clear()
+        if buffer:
+            yield np.array(buffer, dtype=self.RECORD_DTYPE)
+    
+    @metrics.timed("marks.run")
+    def run(self, output_format='text'):
         """
         Main method to run the student marks processor.
+        output_format selects the results file format (see write_results).
         """
         print("=" * 60)
         print("STUDENT MARKS PROCESSOR")
@@ -243,7 +1135,7 @@ class StudentMarksProcessor:
                 output_file = "results.txt"
             
             # Write results to file
-            if not self.write_results(output_file):
+            if not self.write_results(output_file, output_format):
                 return
             
             # Display statistics
@@ -257,7 +1149,100 @@ class StudentMarksProcessor:
             print(f"An unexpected error occurred: {e}")
 
 
+def _process_batch_file(task):
+    """
+    Process pool worker for process_batch: reads, sorts and writes one file.
+    Console output is captured and returned so the parent can print it per file.
+    """
+    input_file, output_file, output_format, settings = task
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        processor = StudentMarksProcessor(**settings)
+        ok = processor.read_marks_file(input_file)
+        if ok:
+            processor.sort_by_overall_mark()
+            ok = processor.write_results(output_file, output_format)
+    
+    result = {'input': input_file, 'ok': ok, 'log': log.getvalue()}
+    if ok:
+        data = processor.students_data
+        result['counts'] = np.bincount(data['grade'], minlength=len(processor.grade_labels))
+        result['sums'] = np.array([np.sum(data[field], dtype=np.float64)
+                                   for field in ('exam_mark', 'coursework_mark', 'overall_mark')])
+    return result
+
+
+def generate_marks_file(filename, rows, seed=0):
+    """
+    Writes a synthetic marks file with rows random students (one decimal per mark).
+    Used by the benchmarks.
+    """
+    rng = np.random.default_rng(seed)
+    marks = rng.integers(0, 1001, size=(rows, 2)) / 10
+    with open(filename, 'w') as file:
+        for start in range(0, rows, 100_000):
+            block = marks[start:start + 100_000]
+            file.write("".join(
+                f"S{start + i:08d} {exam:.1f} {coursework:.1f}\n"
+                for i, (exam, coursework) in enumerate(block.tolist())
+            ))
+
+
+def benchmark_batch(files=32, rows=50_000, worker_counts=(1, 2, 4, 8)):
+    """
+    Measures process_batch throughput on synthetic files for each worker count.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, "inputs")
+        os.makedirs(input_dir)
+        for i in range(files):
+            generate_marks_file(os.path.join(input_dir, f"course{i:03d}.txt"), rows, seed=i)
+        
+        print(f"Batch processing {files} files x {rows} students ({os.cpu_count()} CPU(s) available)")
+        print(f"{'Workers':>8} {'Seconds':>10} {'Records/s':>14} {'Speedup':>9}")
+        print("-" * 44)
+        baseline = None
+        for workers in worker_counts:
+            processor = StudentMarksProcessor()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                processor.process_batch(input_dir, os.path.join(work_dir, f"out{workers}"), workers=workers)
+            elapsed = time.perf_counter() - start
+            
+            if baseline is None:
+                baseline = elapsed
+            print(f"{workers:>8} {elapsed:>10.2f} {files * rows / elapsed:>14,.0f} {baseline / elapsed:>8.2f}x")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Student Marks Processor")
+    parser.add_argument("--chunked", metavar="INPUT",
+                        help="process INPUT out of core with bounded memory instead of prompting")
+    parser.add_argument("--output", default="results.txt", help="report file for --chunked (default: results.txt)")
+    parser.add_argument("--format", choices=("text", "csv", "npz"), default="text",
+                        help="output format of the results file (default: text)")
+    parser.add_argument("--chunk-mb", type=int, default=8, help="input read per chunk in --chunked mode, in MB")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse parsed input across runs via an <input>.cache directory (default: no cache)")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB",
+                        help="process every matching marks file in parallel instead of prompting")
+    parser.add_argument("--output-dir", default="results", help="directory for --batch reports (default: results)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --batch (default or 0: all cores)")
+    parser.add_argument("--benchmark-batch", action="store_true",
+                        help="measure --batch throughput for 1, 2, 4 and 8 workers")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    
     # Create processor with default weighting (60% exam, 40% coursework)
-    processor = StudentMarksProcessor()
-    processor.run()
\ No newline at end of file
+    processor = StudentMarksProcessor(use_cache=args.cache)
+    with instrumentation.session(args):
+        if args.benchmark_batch:
+            benchmark_batch()
+        elif args.batch:
+            processor.process_batch(args.batch, args.output_dir, workers=args.workers, output_format=args.format)
+        elif args.chunked:
+            processor.process_large_file(args.chunked, args.output, chunk_bytes=args.chunk_mb << 20,
+                                         output_format=args.format)
+        else:
+            processor.run(args.format)
\ No newline at end of file
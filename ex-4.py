@@ -1,13 +1,721 @@
 import requests
 import os
+import json
+import csv
+import atexit
+import tempfile
+import hashlib
+import io
+import threading
+import time
+import random
+import sqlite3
+import zlib
+import argparse
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qs, urlparse
+
+import instrumentation
+from instrumentation import metrics
+
+
+API_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+# Classification limits used by analyze_weather and analyze_many:
+# cold at or below cold_max, hot at or above hot_min, mild in between (°C);
+# warnings above high_wind (m/s) and high_humidity (%)
+DEFAULT_THRESHOLDS = {"cold_max": 10, "hot_min": 25, "high_wind": 10, "high_humidity": 80}
+
+
+class WeatherCache:
+    """
+    Bounded in-memory cache of weather responses with a time-to-live and LRU eviction.
+    
+    Entries are keyed by normalized city name and units. With cache_dir set, entries
+    are also written there as JSON files so separate runs can share them.
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl: float = 600, cache_dir: str = None):
+        """
+        Args:
+            max_entries (int): Responses kept in memory before the least recently used is evicted
+            ttl (float): Seconds a response stays valid
+            cache_dir (str, optional): Directory for the shared on-disk tier
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        # key -> (expiry time, response), least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(city: str, units: str = "metric") -> str:
+        """Normalize case and whitespace so 'New  York' and 'new york' share an entry."""
+        return f"{units}:{' '.join(city.split()).casefold()}"
+    
+    def get(self, city: str, units: str = "metric") -> dict | None:
+        """
+        Return the cached response for a city, or None if it is missing or expired.
+        """
+        key = self.make_key(city, units)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+        
+        # Fall back to the disk tier, promoting a fresh entry into memory
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry and entry[0] > now:
+                self._store(key, entry)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+    
+    def put(self, city: str, response: dict, units: str = "metric"):
+        """Cache a successful response for a city."""
+        key = self.make_key(city, units)
+        entry = (time.time() + self.ttl, response)
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+    
+    def clear(self):
+        """Drop every in-memory entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Entry count, hits, misses and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+    
+    def _store(self, key: str, entry: tuple):
+        # Caller holds the lock
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+    
+    def _read_disk(self, key: str) -> tuple | None:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as file:
+                stored = json.load(file)
+            return stored["expires"], stored["response"]
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def _write_disk(self, key: str, entry: tuple):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"expires": entry[0], "response": entry[1]}, file)
+            # Atomic rename, so concurrent readers never see a partial file
+            os.replace(temp_path, path)
+        except OSError:
+            # The disk tier is best effort
+            pass
+
+
+class WeatherLogger:
+    """
+    Buffers weather log entries and appends them to a CSV file in batches.
+    
+    A batch is written once batch_size entries are waiting, or by a timer flush_interval
+    seconds after the first entry of the batch arrived. Loggers that are still open at
+    exit are flushed in the order they were created.
+    """
+    
+    FIELDS = ["city", "temperature", "humidity", "wind_speed", "description", "category"]
+    
+    def __init__(self, filename: str, batch_size: int = 1000, flush_interval: float = 5.0):
+        """
+        Args:
+            filename (str): Path to CSV file for logging
+            batch_size (int): Entries buffered before a write
+            flush_interval (float): Longest time in seconds an entry waits to be written
+        """
+        self.filename = filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._timer = None
+        self._lock = threading.RLock()
+        with _LOGGERS_LOCK:
+            _OPEN_LOGGERS.append(self)
+    
+    def log(self, entry: dict):
+        """Queue one entry (a dict with the FIELDS keys), writing the batch if it is full."""
+        with self._lock:
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                # The first entry of a batch starts the clock for the whole batch
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    @metrics.timed("weather.flush")
+    def flush(self):
+        """Append every buffered entry to the file in one write."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            entries, self._buffer = self._buffer, []
+            if not entries:
+                return
+            metrics.count("weather.rows_written", len(entries))
+            
+            # Headers are needed only for a new or empty file
+            write_header = not os.path.isfile(self.filename) or os.path.getsize(self.filename) == 0
+            with open(self.filename, "a", newline="", encoding="utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames=self.FIELDS, lineterminator="\n")
+                if write_header:
+                    writer.writeheader()
+                writer.writerows(entries)
+    
+    def close(self):
+        """Write any remaining entries and stop flushing this logger at exit."""
+        self.flush()
+        with _LOGGERS_LOCK:
+            if self in _OPEN_LOGGERS:
+                _OPEN_LOGGERS.remove(self)
+            path = os.path.abspath(self.filename)
+            if _LOGGERS_BY_PATH.get(path) is self:
+                del _LOGGERS_BY_PATH[path]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Every open logger, oldest first, and the shared logger of each CSV file by absolute path
+_OPEN_LOGGERS = []
+_LOGGERS_BY_PATH = {}
+_LOGGERS_LOCK = threading.Lock()
+
+
+def get_logger(filename: str) -> WeatherLogger:
+    """
+    Return the shared buffered logger for a CSV file, creating it on first use.
+    All Weather clients logging to the same file share it, so rows keep their order.
+    """
+    path = os.path.abspath(filename)
+    with _LOGGERS_LOCK:
+        logger = _LOGGERS_BY_PATH.get(path)
+    if logger is None:
+        logger = WeatherLogger(filename)
+        with _LOGGERS_LOCK:
+            # Another thread may have created one meanwhile; keep the first
+            logger_in_place = _LOGGERS_BY_PATH.setdefault(path, logger)
+        if logger_in_place is not logger:
+            logger.close()
+            logger = logger_in_place
+    return logger
+
+
+@atexit.register
+def _flush_open_loggers():
+    # One exit hook for all loggers, flushing them in creation order
+    with _LOGGERS_LOCK:
+        loggers = list(_OPEN_LOGGERS)
+    for logger in loggers:
+        logger.flush()
+
+
+class WeatherHistory:
+    """
+    Local store of every logged observation, in SQLite with an index on city and time.
+    
+    Per-city time-range queries and rolling aggregates read only the matching index
+    range instead of re-reading whole CSV logs. Legacy CSV logs are imported with
+    compact_csv. For every CSV log the store remembers how many leading bytes it
+    already holds, so importing a log again, or a log whose rows were mirrored in
+    through add_logged, only adds rows that are not in the store yet.
+    """
+    
+    COLUMNS = ["city", "timestamp", "temperature", "humidity", "wind_speed", "description", "category"]
+    
+    def __init__(self, path: str = "weather_history.db"):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # Serializes catching up on a CSV log with writing to it (see add_logged)
+        self._log_lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            if path != ":memory:":
+                # Readers are not blocked by the writer
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS observations (
+                    city_key TEXT NOT NULL,
+                    city TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    temperature REAL,
+                    humidity REAL,
+                    wind_speed REAL,
+                    description TEXT,
+                    category TEXT
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS observations_city_time ON observations (city_key, timestamp)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS observations_time ON observations (timestamp)")
+            # The first `offset` bytes of each CSV log are already in observations
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS log_files (
+                    path TEXT PRIMARY KEY,
+                    offset INTEGER NOT NULL,
+                    mtime REAL NOT NULL
+                )""")
+    
+    @staticmethod
+    def city_key(city: str) -> str:
+        """Normalize case and whitespace, as WeatherCache does."""
+        return " ".join(city.split()).casefold()
+    
+    @metrics.timed("weather.history.add")
+    def add(self, entries: list, timestamp: float = None) -> int:
+        """
+        Store log entries (dicts with WeatherLogger.FIELDS keys) in one transaction.
+        
+        Args:
+            entries (list): Entries to store; an entry's own 'timestamp' key wins
+            timestamp (float, optional): Unix time for entries without one (default: now)
+            
+        Returns:
+            int: Number of entries stored
+        """
+        with self._lock, self._conn:
+            return self._insert(entries, timestamp)
+    
+    def add_logged(self, filename: str, entries: list, logger: "WeatherLogger" = None,
+                   timestamp: float = None) -> int:
+        """
+        Write entries to a CSV log and store them, keeping the log and the store in step.
+        
+        Rows already in the file but not yet in the store (e.g. from before the store
+        was used) are imported first, then the entries are written and flushed, and
+        the store records the whole file as imported. A later compact_csv of the same
+        file therefore adds nothing.
+        
+        Args:
+            filename (str): CSV log the entries are written to
+            entries (list): Entries to log and store; a 'timestamp' key is stored but not logged
+            logger (WeatherLogger, optional): Logger of the file (default: get_logger(filename))
+            timestamp (float, optional): Unix time for entries without one (default: now)
+            
+        Returns:
+            int: Number of entries stored
+        """
+        logger = logger or get_logger(filename)
+        with self._log_lock:
+            # Anything another writer left buffered goes to disk and is imported first
+            logger.flush()
+            if os.path.exists(filename):
+                self.compact_csv(filename)
+            for entry in entries:
+                logger.log({field: entry.get(field) for field in logger.FIELDS})
+            logger.flush()
+            with self._lock, self._conn:
+                stored = self._insert(entries, timestamp)
+                self._mark_imported(filename)
+        return stored
+    
+    @metrics.timed("weather.history.query")
+    def query(self, city: str, start: float = None, end: float = None) -> pd.DataFrame:
+        """
+        Observations for one city between start (inclusive) and end (exclusive), oldest first.
+        
+        Args:
+            city (str): City name, matched case- and whitespace-insensitively
+            start (float, optional): Unix time of the earliest observation
+            end (float, optional): Unix time after the latest observation
+            
+        Returns:
+            pd.DataFrame: One row per observation with the COLUMNS columns
+        """
+        sql, params = self._range_filter(city, start, end)
+        return self._read(f"SELECT {', '.join(self.COLUMNS)} FROM observations WHERE {sql} "
+                          "ORDER BY timestamp", params)
+    
+    @metrics.timed("weather.history.rolling")
+    def rolling(self, city: str, window: float, start: float = None, end: float = None) -> pd.DataFrame:
+        """
+        Rolling temperature, humidity and wind statistics for one city.
+        
+        Args:
+            city (str): City name
+            window (float): Width of the trailing window in seconds
+            start (float, optional): Unix time of the earliest observation reported
+            end (float, optional): Unix time after the latest observation reported
+            
+        Returns:
+            pd.DataFrame: timestamp, observation count, mean/min/max temperature and
+                          mean humidity and wind speed over the window ending at each row
+        """
+        # Read back one extra window so the first reported rows have full history
+        sql, params = self._range_filter(city, None if start is None else start - window, end)
+        frame = "OVER (ORDER BY timestamp RANGE BETWEEN ? PRECEDING AND CURRENT ROW)"
+        result = self._read(f"""
+            SELECT timestamp,
+                   COUNT(*) {frame} AS count,
+                   AVG(temperature) {frame} AS temperature_mean,
+                   MIN(temperature) {frame} AS temperature_min,
+                   MAX(temperature) {frame} AS temperature_max,
+                   AVG(humidity) {frame} AS humidity_mean,
+                   AVG(wind_speed) {frame} AS wind_speed_mean
+            FROM observations WHERE {sql} ORDER BY timestamp""", [window] * 6 + params)
+        if start is not None:
+            result = result[result["timestamp"] >= start].reset_index(drop=True)
+        return result
+    
+    def summary(self, start: float = None, end: float = None) -> pd.DataFrame:
+        """
+        Per-city aggregates over a time range.
+        
+        Returns:
+            pd.DataFrame: city, observation count, first/last timestamp and
+                          mean/min/max temperature, one row per city
+        """
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("timestamp < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._read(f"""
+            SELECT MIN(city) AS city, COUNT(*) AS count,
+                   MIN(timestamp) AS first, MAX(timestamp) AS last,
+                   AVG(temperature) AS temperature_mean,
+                   MIN(temperature) AS temperature_min,
+                   MAX(temperature) AS temperature_max
+            FROM observations {where} GROUP BY city_key ORDER BY city_key""", params)
+    
+    @metrics.timed("weather.history.compact")
+    def compact_csv(self, filename: str, timestamp: float = None, remove: bool = False,
+                    chunksize: int = 100_000) -> int:
+        """
+        Import the rows of a CSV log written by log_weather that are not in the store yet.
+        
+        Rows keep their own 'timestamp' column if the file has one. Legacy logs have
+        none, so their rows are stamped with the file's modification time (or the
+        timestamp argument). Importing the same file again only picks up rows appended
+        since; a file that has shrunk is taken to be a new log and imported in full.
+        
+        Args:
+            filename (str): CSV log to import
+            timestamp (float, optional): Unix time for rows without one
+            remove (bool): Delete the CSV file once it has been imported
+            chunksize (int): Rows parsed and inserted at a time
+            
+        Returns:
+            int: Number of rows imported
+        """
+        with self._log_lock:
+            size = os.path.getsize(filename)
+            if timestamp is None:
+                timestamp = os.path.getmtime(filename)
+            with self._lock:
+                row = self._conn.execute("SELECT offset FROM log_files WHERE path = ?",
+                                         (os.path.abspath(filename),)).fetchone()
+            offset = row[0] if row and row[0] <= size else 0
+            
+            imported = 0
+            if offset < size:
+                # Continue after the imported bytes, reusing the file's own header
+                names = None if offset == 0 else pd.read_csv(filename, nrows=0).columns
+                with open(filename, "rb") as file, self._lock, self._conn:
+                    file.seek(offset)
+                    # Stop at the size seen above, even if the file grows meanwhile
+                    reader = pd.read_csv(io.BufferedReader(_ByteRange(file, size - offset)),
+                                         header=0 if names is None else None, names=names,
+                                         chunksize=chunksize)
+                    for chunk in reader:
+                        chunk = chunk.astype(object).where(chunk.notna(), None)
+                        imported += self._insert(chunk.to_dict("records"), timestamp)
+                    self._mark_imported(filename, size)
+            
+            if remove:
+                os.remove(filename)
+                with self._lock, self._conn:
+                    self._conn.execute("DELETE FROM log_files WHERE path = ?", (os.path.abspath(filename),))
+            return imported
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _insert(self, entries: list, timestamp: float = None) -> int:
+        # Caller holds the lock and an open transaction
+        default = time.time() if timestamp is None else timestamp
+        rows = [(self.city_key(entry["city"]), entry["city"], entry.get("timestamp", default),
+                 entry.get("temperature"), entry.get("humidity"), entry.get("wind_speed"),
+                 entry.get("description"), entry.get("category")) for entry in entries]
+        self._conn.executemany("INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+    
+    def _mark_imported(self, filename: str, size: int = None):
+        # Caller holds the lock and an open transaction
+        self._conn.execute("INSERT OR REPLACE INTO log_files VALUES (?, ?, ?)",
+                           (os.path.abspath(filename),
+                            os.path.getsize(filename) if size is None else size,
+                            os.path.getmtime(filename)))
+    
+    def _range_filter(self, city: str, start: float, end: float) -> tuple:
+        # The leading city_key equality lets SQLite walk the composite index
+        sql, params = "city_key = ?", [self.city_key(city)]
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND timestamp < ?"
+            params.append(end)
+        return sql, params
+    
+    def _read(self, sql: str, params: list) -> pd.DataFrame:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only stream over the next length bytes of an open binary file."""
+    
+    def __init__(self, file, length: int):
+        self._file = file
+        self._remaining = length
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._file.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter shared by every request a Weather client makes.
+    
+    Tokens refill at `rate` per second up to `burst`. The rate adapts: a 429 from the
+    API halves it (and honours any Retry-After pause), and each success raises it again
+    by a fixed share of the configured rate until it is back there.
+    """
+    
+    def __init__(self, rate: float = 10, burst: int = None, min_rate: float = 0.5,
+                 recovery: float = 0.05):
+        """
+        Args:
+            rate (float): Highest sustained requests per second
+            burst (int, optional): Bucket size, i.e. requests allowed back to back (default: rate)
+            min_rate (float): Floor the rate never drops below after throttling
+            recovery (float): Share of rate added back after each success
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.min_rate = min_rate
+        self.recovery = recovery
+        self.throttled = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return
+            time.sleep(wait)
+    
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+        
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is expected
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+    
+    def throttle(self, retry_after: float = None):
+        """Slow down after a 429, pausing every caller for retry_after seconds if given."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Drop queued-up burst capacity so waiting threads do not stampede
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            self.throttled += 1
+    
+    def succeed(self):
+        """Speed back up by one recovery step after a successful request."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.recovery * self.max_rate)
+    
+    def _refill(self, now: float):
+        # Caller holds the lock
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to wait first.
+    
+    Delays grow exponentially from base_delay up to max_delay with full jitter, so
+    threads that failed together do not retry together. A Retry-After header from
+    the server takes precedence when it is longer.
+    """
+    
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 30):
+        """
+        Args:
+            max_retries (int): Retries after the first attempt (0 disables retrying)
+            base_delay (float): Upper bound of the first backoff in seconds
+            max_delay (float): Cap on any single backoff in seconds
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+    
+    def should_retry(self, attempt: int, status=None) -> bool:
+        """
+        Args:
+            attempt (int): Number of attempts already made, starting at 1
+            status (int, optional): HTTP status, or None for a connection error or timeout
+        """
+        return attempt <= self.max_retries and (status is None or status in self.RETRY_STATUSES)
+    
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        """Seconds to wait before the next attempt."""
+        self.retries += 1
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(backoff, min(retry_after or 0, self.max_delay))
+    
+    @staticmethod
+    def parse_retry_after(response) -> float | None:
+        """Read a Retry-After header given in seconds; HTTP dates are ignored."""
+        try:
+            return max(0.0, float(response.headers["Retry-After"]))
+        except (KeyError, TypeError, ValueError):
+            return None
 
 
 class Weather:
-    def __init__(self, api_key=os.getenv("weather_api_key")):
-        """Initialize Weather client with API key."""
+    def __init__(self, api_key=os.getenv("weather_api_key"), base_url: str = API_URL,
+                 timeout: float = 10, max_workers: int = 16, cache: WeatherCache = None,
+                 thresholds: dict = None, rate_limiter: RateLimiter = None,
+                 retry: RetryPolicy = None, history: WeatherHistory = None):
+        """
+        Initialize Weather client with API key.
+        
+        Args:
+            api_key (str): OpenWeatherMap API key
+            base_url (str): Weather endpoint, e.g. a local stub server for testing
+            timeout (float): Per-request timeout in seconds (connect and read)
+            max_workers (int): Default number of concurrent requests in fetch_many
+            cache (WeatherCache, optional): Response cache consulted before each request
+            thresholds (dict, optional): Overrides for DEFAULT_THRESHOLDS
+            rate_limiter (RateLimiter, optional): Request quota shared by all fetches
+            retry (RetryPolicy, optional): Retry schedule for 429s, 5xx and connection
+                errors (default: RetryPolicy(); pass RetryPolicy(max_retries=0) to disable)
+            history (WeatherHistory, optional): Store that also receives every logged entry
+        """
         self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.history = history
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self._summaries = self._build_summaries()
+        
+        # One pooled session keeps connections alive between requests;
+        # the pool is sized so every fetch_many worker can hold a connection
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
+    @metrics.timed("weather.fetch")
     def fetch_weather(self, city: str, api_key: str = None) -> dict:
         """
         Fetch current weather data for a city.
@@ -15,27 +723,94 @@ class Weather:
         # Use instance API key if not provided
         if not api_key:
             api_key = self.api_key
+        
+        # Serve recent responses from the cache
+        if self.cache:
+            cached = self.cache.get(city)
+            if cached is not None:
+                metrics.count("weather.cache_hits")
+                return cached
             
-        try:
-            # Make API request with metric units
-            url = f'https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric'
-            fetch = requests.get(url)
+        params = {"q": city, "appid": api_key, "units": "metric"}
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter:
+                with metrics.stage("weather.rate_limit_wait"):
+                    self.rate_limiter.acquire()
+            try:
+                # Make API request with metric units over the pooled session
+                metrics.count("weather.requests")
+                with metrics.stage("weather.http"):
+                    fetch = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # Transient network failure: back off and try again
+                if self.retry.should_retry(attempt):
+                    metrics.count("weather.retries")
+                    time.sleep(self.retry.delay(attempt))
+                    continue
+                return {
+                    "error": "exception",
+                    "message": str(e)
+                }
+            except Exception as e:
+                # Handle any other request errors
+                return {
+                    "error": "exception",
+                    "message": str(e)
+                }
             
-            if fetch.status_code == 200:
-                response = fetch.json()
-                return response
-            else:
-                # Return error details
+            if fetch.status_code == 429:
+                metrics.count("weather.throttled")
+                if self.rate_limiter:
+                    self.rate_limiter.throttle(RetryPolicy.parse_retry_after(fetch))
+            if fetch.status_code != 200 and self.retry.should_retry(attempt, fetch.status_code):
+                metrics.count("weather.retries")
+                time.sleep(self.retry.delay(attempt, RetryPolicy.parse_retry_after(fetch)))
+                continue
+            
+            try:
+                if fetch.status_code == 200:
+                    response = fetch.json()
+                    if self.rate_limiter:
+                        self.rate_limiter.succeed()
+                    if self.cache:
+                        self.cache.put(city, response)
+                    return response
+                else:
+                    # Return error details
+                    metrics.count("weather.errors")
+                    return {
+                        "error": fetch.status_code,
+                        "message": fetch.json() if fetch.content else "error fetching response from api"
+                    }
+            except Exception as e:
+                # Handle parsing errors
                 return {
-                    "error": fetch.status_code,
-                    "message": fetch.json() if fetch.content else "error fetching response from api"
+                    "error": "exception",
+                    "message": str(e)
                 }
-        except Exception as e:
-            # Handle connection or parsing errors
-            return {
-                "error": "exception",
-                "message": str(e)
-            }
+        
+    @metrics.timed("weather.fetch_many")
+    def fetch_many(self, cities: list, max_workers: int = None) -> dict:
+        """
+        Fetch current weather data for many cities concurrently.
+        
+        Args:
+            cities (list): City names; duplicates are fetched once
+            max_workers (int, optional): Concurrent requests (default: self.max_workers)
+            
+        Returns:
+            dict: City name -> response or error dictionary, in input order
+        """
+        cities = list(dict.fromkeys(cities))
+        if not cities:
+            return {}
+        
+        workers = min(max_workers or self.max_workers, len(cities))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            responses = executor.map(self.fetch_weather, cities)
+            return dict(zip(cities, responses))
         
     def analyze_weather(self, weather_data: dict) -> str:
         """
@@ -54,31 +829,84 @@ class Weather:
         except Exception as e:
             raise e
         
-        warnings = []
+        # Same rules as the batch analyzer, applied to a single observation
+        return str(self.analyze_many([temp], [humidity], [wind_speed])["summary"][0])
+    
+    @metrics.timed("weather.analyze")
+    def analyze_many(self, temperatures, humidities, wind_speeds) -> dict:
+        """
+        Analyze whole columns of observations at once.
         
-        # Check for high wind conditions
-        if wind_speed > 10:
-            warnings.append("High wind alert!")
+        Args:
+            temperatures (array-like): Temperatures in °C
+            humidities (array-like): Relative humidity in %
+            wind_speeds (array-like): Wind speeds in m/s
+            Missing values (None or NaN) raise no warning; a missing temperature
+            is categorized as 'Unknown'.
             
-        # Check for high humidity
-        if humidity > 80:
-            warnings.append("Humid conditions!")
+        Returns:
+            dict: NumPy arrays 'category' (label), 'high_wind' and 'humid' (bool),
+                  and 'summary' (the analyze_weather text for each observation)
+        """
+        temps = np.asarray(temperatures, dtype=np.float64)
+        humidities = np.asarray(humidities, dtype=np.float64)
+        wind_speeds = np.asarray(wind_speeds, dtype=np.float64)
         
-        # Categorize temperature
-        if int(temp) <= 10:
-            temp_category = "Cold (≤10°C)"
-        elif int(temp) in range(11, 25):
-            temp_category = "Mild (11-24°C)"
-        else:
-            temp_category = "Hot (≥25°C)"
+        # Category codes: 0 cold, 1 mild, 2 hot, 3 unknown
+        codes = np.full(temps.shape, 1, dtype=np.uint8)
+        codes[temps <= self.thresholds["cold_max"]] = 0
+        codes[temps >= self.thresholds["hot_min"]] = 2
+        codes[np.isnan(temps)] = 3
         
-        # Combine category with warnings
-        result = temp_category
-        if warnings:
-            result += "\nWarnings: " + ", ".join(warnings)
+        # Comparisons with NaN are False, so missing readings raise no warning
+        high_wind = wind_speeds > self.thresholds["high_wind"]
+        humid = humidities > self.thresholds["high_humidity"]
         
-        return result
+        summary = self._summaries[codes.astype(np.intp) * 4 + high_wind * 2 + humid]
+        return {
+            "category": self._summaries[codes.astype(np.intp) * 4],
+            "high_wind": high_wind,
+            "humid": humid,
+            "summary": summary,
+        }
+    
+    def analyze_log(self, filename: str) -> pd.DataFrame:
+        """
+        Re-analyze every row of a weather CSV log with the current thresholds.
+        
+        Args:
+            filename (str): Path to a CSV file written by log_weather
+            
+        Returns:
+            pd.DataFrame: The log with its category column recomputed
+        """
+        log = pd.read_csv(filename)
+        analysis = self.analyze_many(log["temperature"], log["humidity"], log["wind_speed"])
+        log["category"] = analysis["summary"]
+        return log
+    
+    def _build_summaries(self) -> np.ndarray:
+        """
+        Build the text for every combination of category and warnings,
+        indexed by category code * 4 + high wind * 2 + humid.
+        """
+        cold, hot = self.thresholds["cold_max"], self.thresholds["hot_min"]
+        # The default limits keep the label logs have always carried
+        if (cold, hot) == (DEFAULT_THRESHOLDS["cold_max"], DEFAULT_THRESHOLDS["hot_min"]):
+            mild = "Mild (11-24°C)"
+        else:
+            mild = f"Mild (>{cold:g} to <{hot:g}°C)"
+        categories = [f"Cold (≤{cold:g}°C)", mild, f"Hot (≥{hot:g}°C)", "Unknown"]
+        
+        summaries = []
+        for category in categories:
+            for high_wind in (False, True):
+                for humid in (False, True):
+                    warnings = ["High wind alert!"] * high_wind + ["Humid conditions!"] * humid
+                    summaries.append(category + ("\nWarnings: " + ", ".join(warnings) if warnings else ""))
+        return np.array(summaries, dtype=object)
     
+    @metrics.timed("weather.log")
     def log_weather(self, city: str, filename: str) -> dict:
         """
         Fetch weather data and log it to a CSV file.
@@ -100,13 +928,71 @@ class Weather:
                 "message": str(weather_data)
             }
         
+        # One record per call: write it now, so the file matches the returned status
+        entry = self.make_log_entry(city, weather_data)
+        logger = self.get_logger(filename)
+        if self.history is not None:
+            self.history.add_logged(filename, [entry], logger, weather_data.get("dt"))
+        else:
+            logger.log(entry)
+            logger.flush()
+        
+        return {
+            "status": "success",
+            "message": f"Weather data for {city} logged to {filename}"
+        }
+    
+    @metrics.timed("weather.log_many")
+    def log_many(self, cities: list, filename: str) -> dict:
+        """
+        Fetch weather data for many cities concurrently and log them in one write.
+        
+        Args:
+            cities (list): City names
+            filename (str): Path to CSV file for logging
+            
+        Returns:
+            dict: Number of cities logged and the error dictionary of each failed city
+        """
+        logger = self.get_logger(filename)
+        errors = {}
+        entries = []
+        for city, weather_data in self.fetch_many(cities).items():
+            if "error" in weather_data:
+                errors[city] = weather_data
+            else:
+                entries.append((self.make_log_entry(city, weather_data), weather_data.get("dt", time.time())))
+        
+        if self.history is not None:
+            # The history store keeps the observation time the API reported
+            self.history.add_logged(filename, [{**entry, "timestamp": dt} for entry, dt in entries], logger)
+        else:
+            for entry, _ in entries:
+                logger.log(entry)
+            logger.flush()
+        
+        return {
+            "status": "success" if not errors else "partial",
+            # fetch_many drops repeated cities, so count what was actually written
+            "logged": len(entries),
+            "errors": errors
+        }
+    
+    def get_logger(self, filename: str) -> WeatherLogger:
+        """Return the shared buffered logger for a CSV file (see get_logger)."""
+        return get_logger(filename)
+    
+    def make_log_entry(self, city: str, weather_data: dict) -> dict:
+        """
+        Extract the logged fields from a weather response.
+        """
         # Extract relevant weather metrics
         main_data = weather_data.get("main", {})
         wind_data = weather_data.get("wind", {})
         weather_desc = weather_data.get("weather", [{}])[0]
         
         # Prepare log entry with all relevant data
-        log_entry = {
+        return {
             "city": city,
             "temperature": main_data.get("temp"),
             "humidity": main_data.get("humidity"),
@@ -114,21 +1000,262 @@ class Weather:
             "description": weather_desc.get("description"),
             "category": self.analyze_weather(weather_data)
         }
+       
+
+class _StubWeatherHandler(BaseHTTPRequestHandler):
+    """Answers weather requests with deterministic fake data for the requested city."""
+    
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
         
-        # Determine if CSV headers are needed
-        file_exists = os.path.isfile(filename)
+        # Over the quota, or unlucky under error_rate: reject like the real API does
+        wait = server.quota.try_acquire() if server.quota else 0
+        if wait or (server.error_rate and server.random.random() < server.error_rate):
+            server.rejected += 1
+            self._send_json(429, {"cod": 429, "message": "rate limit exceeded"},
+                            {"Retry-After": f"{max(wait, 0.01):.2f}"})
+            return
+        server.served += 1
         
-        # Append data to CSV file
-        df = pd.DataFrame([log_entry])
-        df.to_csv(filename, mode='a', header=not file_exists, index=False)
+        query = parse_qs(urlparse(self.path).query)
+        city = query.get("q", [""])[0]
+        # Derive stable readings from the city name
+        seed = zlib.crc32(city.lower().encode())
+        self._send_json(200, {
+            "name": city,
+            "dt": int(time.time()),
+            "main": {"temp": round(-10 + seed % 450 / 10, 1), "humidity": seed % 101},
+            "wind": {"speed": round(seed % 200 / 10, 1)},
+            "weather": [{"description": "stub"}],
+        })
+    
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+
+class StubWeatherServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the weather API, used for tests and benchmarks.
+    
+    With quota set, requests beyond that many per second get a 429 with a Retry-After
+    header, like the real API; error_rate additionally rejects a random share of requests.
+    
+    Usage:
+        with StubWeatherServer(latency=0.05, quota=50) as server:
+            Weather("key", base_url=server.url).fetch_many(cities)
+    """
+    daemon_threads = True
+    
+    def __init__(self, latency: float = 0.0, port: int = 0, quota: float = None,
+                 error_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            latency (float): Seconds each response is delayed
+            port (int): Port to listen on (0 picks a free one)
+            quota (float, optional): Requests per second served before answering 429
+            error_rate (float): Share of requests rejected with 429 regardless of quota
+            seed (int): Seed for the error_rate draws, for repeatable runs
+        """
+        super().__init__(("127.0.0.1", port), _StubWeatherHandler)
+        self.latency = latency
+        # A plain token bucket: min_rate == rate keeps it from adapting
+        self.quota = RateLimiter(quota, min_rate=quota) if quota else None
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.served = 0
+        self.rejected = 0
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL to pass to Weather(base_url=...)."""
+        return f"http://127.0.0.1:{self.server_address[1]}/data/2.5/weather"
+    
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def benchmark_fetch_many(num_cities: int = 200, latency: float = 0.02, worker_counts=(1, 8, 32)):
+    """
+    Compare one-connection-per-call serial fetching with fetch_many on a local stub server.
+    
+    Args:
+        num_cities (int): Number of distinct cities to fetch
+        latency (float): Simulated server latency per request in seconds
+        worker_counts (tuple): Concurrency levels to measure for fetch_many
+    """
+    cities = [f"city{i}" for i in range(num_cities)]
+    with StubWeatherServer(latency=latency) as server:
+        print(f"Fetching {num_cities} cities, {latency * 1000:.0f} ms simulated latency")
+        print(f"{'Method':<24} {'Seconds':>9} {'Cities/s':>10}")
+        print("-" * 45)
         
-        return {
-            "status": "success",
-            "message": f"Weather data for {city} logged to {filename}"
-        }
-       
+        # Previous behaviour: a fresh connection for every city, one at a time
+        start = time.perf_counter()
+        for city in cities:
+            requests.get(f"{server.url}?q={city}&appid=bench&units=metric").json()
+        elapsed = time.perf_counter() - start
+        print(f"{'requests.get serial':<24} {elapsed:>9.2f} {num_cities / elapsed:>10.0f}")
+        
+        for workers in worker_counts:
+            client = Weather("bench", base_url=server.url, max_workers=workers)
+            start = time.perf_counter()
+            results = client.fetch_many(cities)
+            elapsed = time.perf_counter() - start
+            errors = sum("error" in result for result in results.values())
+            label = f"fetch_many x{workers}"
+            print(f"{label:<24} {elapsed:>9.2f} {num_cities / elapsed:>10.0f}" + (f"  ({errors} errors)" if errors else ""))
+
+
+def benchmark_rate_limit(num_cities: int = 300, quota: float = 100, error_rate: float = 0.02,
+                         workers: int = 32):
+    """
+    Fetch against a quota-limited stub server with and without a client-side rate limiter.
+    
+    Args:
+        num_cities (int): Number of distinct cities to fetch
+        quota (float): Requests per second the stub server accepts
+        error_rate (float): Share of requests the server rejects at random
+        workers (int): Concurrent requests in fetch_many
+    """
+    cities = [f"city{i}" for i in range(num_cities)]
+    print(f"Fetching {num_cities} cities with {workers} workers, quota {quota:g}/s, "
+          f"{error_rate:.0%} random 429s")
+    print(f"{'Method':<22} {'Seconds':>9} {'Cities/s':>10} {'Lost':>6} {'429s':>6}")
+    print("-" * 57)
+    
+    configs = [
+        ("no retry, no limiter", RetryPolicy(max_retries=0), None),
+        ("retry only", RetryPolicy(base_delay=0.1), None),
+        ("retry + rate limiter", RetryPolicy(base_delay=0.1), RateLimiter(quota)),
+    ]
+    for label, retry, limiter in configs:
+        with StubWeatherServer(quota=quota, error_rate=error_rate) as server:
+            client = Weather("bench", base_url=server.url, max_workers=workers,
+                             retry=retry, rate_limiter=limiter)
+            start = time.perf_counter()
+            results = client.fetch_many(cities)
+            elapsed = time.perf_counter() - start
+            lost = sum("error" in result for result in results.values())
+            print(f"{label:<22} {elapsed:>9.2f} {num_cities / elapsed:>10.0f} {lost:>6} {server.rejected:>6}")
+
+
+def benchmark_logging(num_records: int = 5000):
+    """
+    Compare per-row DataFrame appends with the batched WeatherLogger.
+    
+    Args:
+        num_records (int): Log entries written by each method
+    """
+    client = Weather("bench")
+    entries = [client.make_log_entry(f"city{i}", {
+        "main": {"temp": -10 + i % 450 / 10, "humidity": i % 101},
+        "wind": {"speed": i % 200 / 10},
+        "weather": [{"description": "stub"}],
+    }) for i in range(num_records)]
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        print(f"Logging {num_records} records")
+        print(f"{'Method':<24} {'Seconds':>9} {'Records/s':>12}")
+        print("-" * 47)
+        
+        # Previous behaviour: a one-row DataFrame and a file open per record
+        pandas_file = os.path.join(work_dir, "pandas.csv")
+        start = time.perf_counter()
+        for entry in entries:
+            file_exists = os.path.isfile(pandas_file)
+            pd.DataFrame([entry]).to_csv(pandas_file, mode='a', header=not file_exists, index=False)
+        elapsed = time.perf_counter() - start
+        print(f"{'DataFrame per row':<24} {elapsed:>9.3f} {num_records / elapsed:>12,.0f}")
+        
+        logger_file = os.path.join(work_dir, "logger.csv")
+        start = time.perf_counter()
+        with WeatherLogger(logger_file) as logger:
+            for entry in entries:
+                logger.log(entry)
+        elapsed = time.perf_counter() - start
+        print(f"{'WeatherLogger':<24} {elapsed:>9.3f} {num_records / elapsed:>12,.0f}")
+        
+        with open(pandas_file, encoding="utf-8") as a, open(logger_file, encoding="utf-8") as b:
+            if a.read() != b.read():
+                print("Warning: the two log files differ!")
+
+
+def benchmark_history(num_records: int = 200_000, num_cities: int = 500):
+    """
+    Compare a per-city query by re-reading a whole CSV log with an indexed WeatherHistory query.
+    
+    Args:
+        num_records (int): Logged observations
+        num_cities (int): Distinct cities they are spread over
+    """
+    client = Weather("bench")
+    start_time = 1_700_000_000
+    rows = np.arange(num_records)
+    temperatures, humidities, wind_speeds = rows % 450 / 10 - 10, rows % 101, rows % 200 / 10
+    log = pd.DataFrame({
+        "city": np.array([f"city{i}" for i in range(num_cities)], dtype=object)[rows % num_cities],
+        "temperature": temperatures,
+        "humidity": humidities,
+        "wind_speed": wind_speeds,
+        "description": "stub",
+        "category": client.analyze_many(temperatures, humidities, wind_speeds)["summary"],
+        "timestamp": start_time + rows * 60,
+    })
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        log_file = os.path.join(work_dir, "log.csv")
+        log.to_csv(log_file, index=False)
+        print(f"{num_records:,} observations of {num_cities} cities")
+        print(f"{'Operation':<30} {'Seconds':>9}")
+        print("-" * 40)
+        
+        with WeatherHistory(os.path.join(work_dir, "history.db")) as history:
+            start = time.perf_counter()
+            history.compact_csv(log_file)
+            print(f"{'compact_csv':<30} {time.perf_counter() - start:>9.3f}")
+            
+            # One day of one city
+            day_start, day_end = start_time + 86_400 * 30, start_time + 86_400 * 31
+            start = time.perf_counter()
+            full = pd.read_csv(log_file)
+            scanned = full[(full["city"] == "city7") & (full["timestamp"] >= day_start) & (full["timestamp"] < day_end)]
+            print(f"{'CSV re-read + filter':<30} {time.perf_counter() - start:>9.3f}")
+            
+            start = time.perf_counter()
+            queried = history.query("city7", day_start, day_end)
+            print(f"{'WeatherHistory.query':<30} {time.perf_counter() - start:>9.4f}")
+            
+            start = time.perf_counter()
+            history.rolling("city7", 86_400, day_start, day_end)
+            print(f"{'WeatherHistory.rolling (1 day)':<30} {time.perf_counter() - start:>9.4f}")
+            
+            if len(scanned) != len(queried):
+                print("Warning: the two queries disagree!")
+
 
-def main(action: str, city: str, filename: str | bool = None):
+def main(action: str, city: str, filename: str | bool = None,
+         cache_dir: str = os.getenv("weather_cache_dir"),
+         history_path: str = os.getenv("weather_history_db")):
     """
     Main entry point for weather operations.
     
@@ -136,12 +1263,16 @@ def main(action: str, city: str, filename: str | bool = None):
         action (str): Action to perform ('analyze_weather' or 'log_weather')
         city (str): City name
         filename (str | bool, optional): CSV filename for logging
+        cache_dir (str, optional): Directory for responses shared between runs
+        history_path (str, optional): SQLite history store that also receives logged entries
         
     Returns:
         str | dict: Analysis result or logging status
     """
-    # Initialize weather client with API key
-    client = Weather(os.getenv("weather_api_key"))
+    # Initialize weather client with API key and response cache
+    history = WeatherHistory(history_path) if history_path else None
+    client = Weather(os.getenv("weather_api_key"), cache=WeatherCache(cache_dir=cache_dir),
+                     history=history)
     
     if action.lower() == "analyze_weather":
         # Fetch and analyze weather
@@ -155,9 +1286,44 @@ def main(action: str, city: str, filename: str | bool = None):
 
 
 if __name__ == "__main__":
-    # Example: Analyze weather for Jaipur
-    res = main("analyze_weather", "jaipur")
-    print(res)
+    parser = argparse.ArgumentParser(description="Weather client")
+    parser.add_argument("--benchmark-fetch", action="store_true",
+                        help="compare serial and concurrent fetching against a local stub server")
+    parser.add_argument("--benchmark-logging", action="store_true",
+                        help="compare per-row DataFrame logging with the batched CSV logger")
+    parser.add_argument("--benchmark-rate-limit", action="store_true",
+                        help="compare fetching with and without rate limiting against a quota-limited stub server")
+    parser.add_argument("--benchmark-history", action="store_true",
+                        help="compare CSV re-reads with indexed history store queries")
+    parser.add_argument("--compact", metavar="CSV", nargs="+",
+                        help="import legacy CSV logs into the history store given by --history")
+    parser.add_argument("--compact-remove", action="store_true",
+                        help="with --compact, delete each CSV log once it has been imported")
+    parser.add_argument("--history", default=os.getenv("weather_history_db"),
+                        help="SQLite history store that also receives logged entries")
+    parser.add_argument("--cache-dir", default=os.getenv("weather_cache_dir"),
+                        help="share cached responses between runs through this directory")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    
+    with instrumentation.session(args):
+        if args.benchmark_fetch:
+            benchmark_fetch_many()
+        elif args.benchmark_rate_limit:
+            benchmark_rate_limit()
+        elif args.benchmark_history:
+            benchmark_history()
+        elif args.compact:
+            with WeatherHistory(args.history or "weather_history.db") as history:
+                for log_file in args.compact:
+                    imported = history.compact_csv(log_file, remove=args.compact_remove)
+                    print(f"{log_file}: {imported} rows imported into {history.path}")
+        elif args.benchmark_logging:
+            benchmark_logging()
+        else:
+            # Example: Analyze weather for Jaipur
+            res = main("analyze_weather", "jaipur", cache_dir=args.cache_dir, history_path=args.history)
+            print(res)
 
 
       
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+Opt-in timers, counters and peak memory per processing stage, shared by the four exercises.
+
+Nothing is recorded unless metrics are enabled; a disabled stage() returns a shared
+no-op context manager and a disabled count() returns at once, so hot paths pay about
+one attribute check. Enable from the command line of any exercise with:
+
+    --metrics metrics.json     write a JSON dump of every stage and counter at exit
+    --trace-memory             also record the peak traced memory of each stage (tracemalloc)
+    --profile run.prof         run under cProfile and save the stats (open with pstats/snakeviz)
+
+or in code:
+
+    from instrumentation import metrics
+    metrics.enable()
+    with metrics.stage("marks.read"):
+        ...
+    metrics.count("marks.records", len(data))
+    metrics.dump("metrics.json")
+"""
+
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; the process peak RSS is then left out of reports
+    resource = None
+
+
+class _Stage:
+    """Times one run of a stage and, with memory tracking on, its peak traced memory."""
+
+    __slots__ = ("metrics", "name", "start", "frame")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.frame = None
+
+    def __enter__(self):
+        if self.metrics.track_memory:
+            self.frame = self.metrics._push_memory()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        peak = self.metrics._pop_memory(self.frame) if self.frame is not None else None
+        self.metrics._record(self.name, elapsed, peak, failed=exc_info[0] is not None)
+        return False
+
+
+class Metrics:
+    """
+    Collects per-stage timings, counters and (optionally) peak memory.
+
+    Stages may nest and may run on several threads at once. Peak memory comes from
+    tracemalloc, which is process-wide, so for stages running concurrently on
+    different threads it is an upper bound rather than an exact figure.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self._lock = threading.Lock()
+        # [memory in use at start, peak so far] of every stage open while tracing
+        self._memory_frames = []
+        self.reset()
+
+    def enable(self, track_memory=False):
+        """Start recording; with track_memory, also trace allocations for per-stage peaks."""
+        self.enabled = True
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        """Stop recording (collected data is kept until reset)."""
+        self.enabled = False
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.track_memory = False
+
+    def reset(self):
+        """Drop every recorded stage and counter."""
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.started = time.time()
+
+    def stage(self, name):
+        """Context manager timing one run of the named stage."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def timed(self, name):
+        """Decorator recording every call of a function as a run of the named stage."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Stage(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def timed_iter(self, name, iterable):
+        """
+        Records the time spent producing each item of iterable as a run of the named
+        stage, so a lazy producer is measured apart from whatever consumes it.
+        Returns iterable unchanged when metrics are disabled.
+        """
+        if not self.enabled:
+            return iterable
+        return self._timed_iter(name, iter(iterable))
+
+    def _timed_iter(self, name, iterator):
+        while True:
+            with _Stage(self, name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, amount=1):
+        """Add amount to the named counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """
+        Returns a JSON-serializable dict: per-stage calls, failures, total/mean/max
+        seconds and peak memory, the counters, and process-wide figures.
+        """
+        with self._lock:
+            stages = {}
+            for name, stage in self.stages.items():
+                stages[name] = {
+                    "calls": stage["calls"],
+                    "failures": stage["failures"],
+                    "total_seconds": stage["total"],
+                    "mean_seconds": stage["total"] / stage["calls"],
+                    "max_seconds": stage["max"],
+                }
+                if stage["peak_memory"] is not None:
+                    stages[name]["peak_memory_bytes"] = stage["peak_memory"]
+            report = {
+                "started": self.started,
+                "wall_seconds": time.time() - self.started,
+                "stages": stages,
+                "counters": dict(self.counters),
+                "process": {"pid": os.getpid()},
+            }
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            report["process"]["max_rss_bytes"] = max_rss if sys.platform == "darwin" else max_rss * 1024
+        if self.track_memory and tracemalloc.is_tracing():
+            report["process"]["traced_memory_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            report["top_allocations"] = [
+                {"location": str(stat.traceback), "size_bytes": stat.size, "blocks": stat.count}
+                for stat in tracemalloc.take_snapshot().statistics("lineno")[:10]
+            ]
+        return report
+
+    def dump(self, path):
+        """Write report() as JSON to path ('-' for stderr, keeping stdout for program output)."""
+        text = json.dumps(self.report(), indent=2)
+        if path == "-":
+            print(text, file=sys.stderr)
+        else:
+            with open(path, "w") as file:
+                file.write(text + "\n")
+
+    def _record(self, name, elapsed, peak, failed):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {"calls": 0, "failures": 0, "total": 0.0, "max": 0.0, "peak_memory": None}
+            stage["calls"] += 1
+            stage["failures"] += failed
+            stage["total"] += elapsed
+            stage["max"] = max(stage["max"], elapsed)
+            if peak is not None:
+                stage["peak_memory"] = max(stage["peak_memory"] or 0, peak)
+
+    def _push_memory(self):
+        # Every open frame, on any thread, keeps the peak seen so far before the reset
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            for frame in self._memory_frames:
+                frame[1] = max(frame[1], peak)
+            frame = [current, current]
+            self._memory_frames.append(frame)
+            tracemalloc.reset_peak()
+            return frame
+
+    def _pop_memory(self, frame):
+        # Returns the peak above the memory in use when the stage started
+        with self._lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            for other in self._memory_frames:
+                other[1] = max(other[1], peak)
+            # Frames are compared by identity; two may hold equal numbers
+            self._memory_frames = [other for other in self._memory_frames if other is not frame]
+            return max(frame[1] - frame[0], 0)
+
+
+_NULL_STAGE = contextlib.nullcontext()
+
+# The instance every exercise records into
+metrics = Metrics()
+
+
+def add_arguments(parser):
+    """Add the --metrics, --trace-memory and --profile options to an argparse parser."""
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--metrics", metavar="PATH",
+                       help="record per-stage timings and counters and write them as JSON ('-' for stderr)")
+    group.add_argument("--trace-memory", action="store_true",
+                       help="with --metrics, also record each stage's peak memory using tracemalloc")
+    group.add_argument("--profile", metavar="PATH", help="run under cProfile and save the stats to PATH")
+
+
+@contextlib.contextmanager
+def session(args):
+    """
+    Run the body with the instrumentation requested by add_arguments' options,
+    writing the metrics dump and profile when it finishes (also on errors).
+    """
+    if args.metrics or args.trace_memory:
+        metrics.enable(track_memory=args.trace_memory)
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if metrics.enabled:
+            metrics.dump(args.metrics or "-")
@@ -0,0 +1,50 @@
+"""Regression tests for StudentMarksProcessor.process_batch (ex-3)."""
+
+import importlib.util
+import os
+import sys
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex3", os.path.join(REPO_DIR, "ex-3.py"))
+ex3 = importlib.util.module_from_spec(_spec)
+sys.modules["ex3"] = ex3  # worker processes unpickle _process_batch_file from here
+_spec.loader.exec_module(ex3)
+
+
+def write_terms(tmp_path):
+    for term, seed in (("a", 1), ("b", 2)):
+        os.makedirs(tmp_path / "terms" / term)
+        ex3.generate_marks_file(str(tmp_path / "terms" / term / "marks.txt"), 20, seed=seed)
+
+
+def test_same_named_inputs_get_separate_results(tmp_path):
+    write_terms(tmp_path)
+    output_dir = tmp_path / "out"
+    assert ex3.StudentMarksProcessor().process_batch(str(tmp_path / "terms" / "*" / "marks.txt"),
+                                                     str(output_dir), workers=1)
+    assert (output_dir / "a" / "marks_results.txt").exists()
+    assert (output_dir / "b" / "marks_results.txt").exists()
+
+
+def test_inputs_sharing_a_results_file_are_rejected(tmp_path, capsys):
+    write_terms(tmp_path)
+    ex3.generate_marks_file(str(tmp_path / "terms" / "a" / "marks.csv"), 5)
+    assert not ex3.StudentMarksProcessor().process_batch(str(tmp_path / "terms" / "*" / "marks.*"),
+                                                         str(tmp_path / "out"), workers=1)
+    assert "would both be written" in capsys.readouterr().out
+
+
+def test_unknown_format_is_reported(tmp_path, capsys):
+    write_terms(tmp_path)
+    assert not ex3.StudentMarksProcessor().process_batch(str(tmp_path / "terms" / "a"), str(tmp_path / "out"),
+                                                         workers=1, output_format='xml')
+    assert "Unknown output format 'xml'" in capsys.readouterr().out
+
+
+def test_zero_workers_means_all_cores(tmp_path):
+    write_terms(tmp_path)
+    assert ex3.StudentMarksProcessor().process_batch(str(tmp_path / "terms" / "a"), str(tmp_path / "out"),
+                                                     workers=0)
+    assert (tmp_path / "out" / "marks_results.txt").exists()
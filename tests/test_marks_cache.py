@@ -0,0 +1,44 @@
+"""Regression tests for the columnar marks cache of StudentMarksProcessor (ex-3)."""
+
+import importlib.util
+import os
+import sys
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex3", os.path.join(REPO_DIR, "ex-3.py"))
+ex3 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex3)
+
+
+def test_cache_is_reused_for_unchanged_file(tmp_path, capsys):
+    marks = tmp_path / "marks.txt"
+    marks.write_text("S1 90 90\nS2 80 80\n")
+    assert ex3.StudentMarksProcessor(use_cache=True).read_marks_file(str(marks))
+    processor = ex3.StudentMarksProcessor(use_cache=True)
+    assert processor.read_marks_file(str(marks))
+    assert "(from cache)" in capsys.readouterr().out
+    assert len(processor.students_data) == 2
+
+
+def test_file_changed_while_parsing_is_not_cached_as_new(tmp_path, capsys):
+    marks = tmp_path / "marks.txt"
+    marks.write_text("S1 90 90\n")
+    processor = ex3.StudentMarksProcessor(use_cache=True)
+    normalise = processor._normalise_newlines
+
+    def append_during_parse(raw):
+        with open(marks, "a") as file:
+            file.write("S2 80 80\n")
+        return normalise(raw)
+
+    processor._normalise_newlines = append_during_parse
+    assert processor.read_marks_file(str(marks))
+    assert len(processor.students_data) == 1
+    capsys.readouterr()
+
+    processor = ex3.StudentMarksProcessor(use_cache=True)
+    assert processor.read_marks_file(str(marks))
+    assert "(from cache)" not in capsys.readouterr().out
+    assert len(processor.students_data) == 2
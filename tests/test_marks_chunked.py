@@ -0,0 +1,42 @@
+"""Regression tests for the out-of-core StudentMarksProcessor.process_large_file (ex-3)."""
+
+import importlib.util
+import os
+import sys
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex3", os.path.join(REPO_DIR, "ex-3.py"))
+ex3 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex3)
+
+
+def in_memory_report(marks, output):
+    processor = ex3.StudentMarksProcessor()
+    assert processor.read_marks_file(str(marks))
+    processor.sort_by_overall_mark()
+    assert processor.write_results(str(output), 'csv')
+    return output.read_text()
+
+
+def test_multi_pass_merge_matches_in_memory_report(tmp_path):
+    marks = tmp_path / "marks.txt"
+    ex3.generate_marks_file(str(marks), 3_000, seed=3)
+    expected = in_memory_report(marks, tmp_path / "memory.csv")
+
+    processor = ex3.StudentMarksProcessor()
+    processor.MERGE_FAN_IN = 3
+    passes = []
+    merge_to_run = processor._merge_to_run
+    processor._merge_to_run = lambda runs, path: passes.append(len(runs)) or merge_to_run(runs, path)
+
+    output = tmp_path / "chunked.csv"
+    temp_dir = tmp_path / "runs"
+    temp_dir.mkdir()
+    # ~2 kB chunks give dozens of runs, so several merge passes are needed
+    assert processor.process_large_file(str(marks), str(output), chunk_bytes=2_000, temp_dir=str(temp_dir),
+                                        output_format='csv')
+    assert output.read_text() == expected
+    assert passes and max(passes) <= 3
+    assert not os.listdir(temp_dir)
@@ -0,0 +1,28 @@
+"""Regression tests for StudentMarksProcessor.write_results (ex-3)."""
+
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex3", os.path.join(REPO_DIR, "ex-3.py"))
+ex3 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex3)
+
+
+def test_npz_is_written_to_the_requested_path(tmp_path):
+    marks = tmp_path / "marks.txt"
+    marks.write_text("S1 70 70\nS2 90 90\n")
+    processor = ex3.StudentMarksProcessor()
+    assert processor.read_marks_file(str(marks))
+    processor.sort_by_overall_mark()
+
+    output = tmp_path / "results.txt"
+    assert processor.write_results(str(output), "npz")
+    assert not (tmp_path / "results.txt.npz").exists()
+    with np.load(output) as results:
+        assert results["students"]["reg_number"].tolist() == ["S2", "S1"]
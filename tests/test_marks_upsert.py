@@ -0,0 +1,46 @@
+"""Regression tests for StudentMarksProcessor.upsert_student (ex-3)."""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex3", os.path.join(REPO_DIR, "ex-3.py"))
+ex3 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex3)
+
+
+@pytest.fixture
+def processor(tmp_path):
+    marks = tmp_path / "marks.txt"
+    marks.write_text("S1 90 90\nS2 80 80\nS3 70 70\nS4 60 60\n")
+    processor = ex3.StudentMarksProcessor()
+    assert processor.read_marks_file(str(marks))
+    processor.sort_by_overall_mark()
+    return processor
+
+
+def report_order(processor):
+    return [str(reg) for block in processor.ordered_blocks() for reg in block['reg_number']]
+
+
+def test_update_existing_student_after_eager_sort(processor):
+    assert processor.upsert_student("S1", 45, 45)
+    assert report_order(processor) == ["S2", "S3", "S4", "S1"]
+
+
+def test_append_student_after_eager_sort(processor):
+    assert processor.upsert_student("S5", 75, 75)
+    assert report_order(processor) == ["S1", "S2", "S5", "S3", "S4"]
+
+
+def test_updated_student_is_written(processor, tmp_path):
+    processor.upsert_student("S2", 95, 95)
+    output = tmp_path / "results.csv"
+    assert processor.write_results(str(output), "csv")
+    rows = output.read_text().splitlines()[1:]
+    assert [row.split(",")[0] for row in rows] == ["S2", "S1", "S3", "S4"]
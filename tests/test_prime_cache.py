@@ -0,0 +1,79 @@
+"""Regression tests for the persistent prime bitset PrimeCache (ex-2)."""
+
+import importlib.util
+import os
+import sys
+import threading
+
+import pytest
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex2", os.path.join(REPO_DIR, "ex-2.py"))
+ex2 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex2)
+
+# One extension step of the cache covers this many numbers
+STEP = 2 * ex2.PrimeCache.EXTEND_BLOCKS * ex2.PrimeCache.BLOCK_BITS
+
+
+def expected_pi(num):
+    return len(ex2._simple_sieve(num))
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "primes.bits")
+
+
+def test_bitset_round_trip(cache_path):
+    cache = ex2.PrimeCache(cache_path)
+    primes = cache.primes_in_range(1, 200_000)
+    limit = cache.limit
+    cache.close()
+
+    reopened = ex2.PrimeCache(cache_path)
+    assert reopened.limit == limit
+    assert primes == ex2._simple_sieve(200_000)
+    assert reopened.primes_in_range(99_000, 101_000) == [p for p in primes if 99_000 <= p <= 101_000]
+    assert reopened.pi(150_000) == expected_pi(150_000)
+    reopened.close()
+
+
+def test_extend_from_separate_opens(cache_path):
+    first = ex2.PrimeCache(cache_path)
+    second = ex2.PrimeCache(cache_path)
+    first.extend(STEP // 2)
+    second.extend(STEP + 10)
+    # first has to pick up the blocks second appended instead of appending its own
+    assert first.pi(STEP + 10) == expected_pi(STEP + 10)
+    assert second.pi(STEP // 3) == expected_pi(STEP // 3)
+    assert os.path.getsize(cache_path) == first.HEADER_SIZE + len(first.block_counts) * first.BLOCK_BYTES
+    first.close()
+    second.close()
+
+
+@pytest.mark.skipif(ex2.fcntl is None, reason="the cache lock needs fcntl")
+def test_concurrent_extension(cache_path):
+    limits = [STEP // 2, STEP, STEP + 1, 2 * STEP]
+    caches = [ex2.PrimeCache(cache_path) for _ in limits]
+    threads = [threading.Thread(target=cache.extend, args=(limit,)) for cache, limit in zip(caches, limits)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reopened = ex2.PrimeCache(cache_path)
+    assert reopened.pi(2 * STEP) == expected_pi(2 * STEP)
+    for cache in caches + [reopened]:
+        cache.close()
+
+
+def test_default_mode_uses_cache_only_when_cheap(cache_path):
+    generator = ex2.PrimeNumberGen(cache_path=cache_path)
+    generator.cache.extend(1_000)
+    assert generator._default_mode(1, 1_000) == "cache"
+    # Filling the cache up to 10**9 for a range of 100 numbers is not worth it
+    assert generator._default_mode(10**9, 10**9 + 100) != "cache"
+    generator.cache.close()
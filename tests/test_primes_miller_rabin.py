@@ -0,0 +1,59 @@
+"""Regression tests for the Miller-Rabin primality test of PrimeNumberGen (ex-2)."""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex2", os.path.join(REPO_DIR, "ex-2.py"))
+ex2 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex2)
+
+# psi(k): the smallest strong pseudoprime to all of the first k prime bases (OEIS A014233)
+PSI = {
+    1: 2_047,
+    2: 1_373_653,
+    3: 25_326_001,
+    4: 3_215_031_751,
+    5: 2_152_302_898_747,
+    6: 3_474_749_660_383,
+    7: 341_550_071_728_321,
+    8: 3_825_123_056_546_413_051,
+    9: 3_825_123_056_546_413_051,
+    12: 318_665_857_834_031_151_167_461,
+    13: 3_317_044_064_679_887_385_961_981,
+}
+
+
+@pytest.mark.parametrize("bound, bases", ex2._MILLER_RABIN_WITNESSES)
+def test_witness_sets_are_deterministic_below_their_bound(bound, bases):
+    assert list(bases) == ex2._simple_sieve(bases[-1])
+    assert bound <= PSI[len(bases)]
+
+
+@pytest.mark.parametrize("num", sorted(set(PSI.values()))[:-1])
+def test_strong_pseudoprimes_are_composite(num):
+    assert not ex2._miller_rabin(num)
+
+
+@pytest.mark.parametrize("num, expected", [
+    (2**31 - 1, True),
+    (2**61 - 1, True),
+    (2**64 - 59, True),            # largest 64-bit prime
+    (2**64 - 1, False),
+    (561 * 1_000_003, False),
+    (3_825_123_056_546_413_051, False),
+    (1_000_000_007 * 998_244_353, False),
+])
+def test_is_prime_large_numbers(num, expected):
+    assert ex2.PrimeNumberGen().is_prime(num) is expected
+
+
+def test_is_prime_many_matches_sieve():
+    limit = 300_000
+    flags = ex2._sieve_flags(limit)
+    assert ex2.PrimeNumberGen().is_prime_many(range(limit + 1)) == [flag == 1 for flag in flags]
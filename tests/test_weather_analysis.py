@@ -0,0 +1,34 @@
+"""Regression tests for the weather categories of Weather.analyze_weather (ex-4)."""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pandas")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex4", os.path.join(REPO_DIR, "ex-4.py"))
+ex4 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex4)
+
+
+def response(temperature):
+    return {"main": {"temp": temperature, "humidity": 50}, "wind": {"speed": 1}}
+
+
+@pytest.mark.parametrize("temperature, category", [
+    (10, "Cold (≤10°C)"),
+    (15, "Mild (11-24°C)"),
+    (25, "Hot (≥25°C)"),
+])
+def test_default_categories_keep_their_labels(temperature, category):
+    assert ex4.Weather("key").analyze_weather(response(temperature)) == category
+
+
+def test_custom_mild_label_excludes_both_limits():
+    weather = ex4.Weather("key", thresholds={"cold_max": 5, "hot_min": 30})
+    assert weather.analyze_weather(response(15)) == "Mild (>5 to <30°C)"
@@ -0,0 +1,77 @@
+"""Regression tests for WeatherHistory.compact_csv and the mirroring of logged rows (ex-4)."""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pandas")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex4", os.path.join(REPO_DIR, "ex-4.py"))
+ex4 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex4)
+
+LEGACY_LOG = (
+    "city,temperature,humidity,wind_speed,description,category\n"
+    "Oslo,4.0,70,3.0,rain,Cold (≤10°C)\n"
+    'Lima,30.0,85,12.0,sun,"Hot (≥25°C)\nWarnings: High wind alert!, Humid conditions!"\n'
+)
+
+
+@pytest.fixture(scope="module")
+def server():
+    with ex4.StubWeatherServer() as server:
+        yield server
+
+
+@pytest.fixture
+def history(tmp_path):
+    with ex4.WeatherHistory(str(tmp_path / "history.db")) as history:
+        yield history
+
+
+def test_compacting_twice_imports_nothing_new(history, tmp_path):
+    log = tmp_path / "log.csv"
+    log.write_text(LEGACY_LOG, encoding="utf-8")
+    assert history.compact_csv(str(log)) == 2
+    assert history.compact_csv(str(log)) == 0
+    assert len(history) == 2
+
+
+def test_compacting_picks_up_appended_rows(history, tmp_path):
+    log = tmp_path / "log.csv"
+    log.write_text(LEGACY_LOG, encoding="utf-8")
+    history.compact_csv(str(log))
+    with open(log, "a", encoding="utf-8") as file:
+        file.write("Rome,18.0,40,2.0,clouds,Mild (11-24°C)\n")
+    assert history.compact_csv(str(log)) == 1
+    assert list(history.query("Rome")["city"]) == ["Rome"]
+
+
+def test_mirrored_rows_are_not_imported_again(server, history, tmp_path):
+    log = str(tmp_path / "log.csv")
+    with open(log, "w", encoding="utf-8") as file:
+        file.write(LEGACY_LOG)
+    weather = ex4.Weather("key", base_url=server.url, history=history)
+    weather.log_many(["A", "B"], log)
+    weather.log_weather("C", log)
+    ex4.get_logger(log).close()
+
+    # The legacy rows are caught up once, the logged ones are stored as they are written
+    assert len(history) == 5
+    assert history.compact_csv(log) == 0
+    assert len(history) == 5
+
+
+def test_compact_remove_deletes_the_log(history, tmp_path):
+    log = tmp_path / "log.csv"
+    log.write_text(LEGACY_LOG, encoding="utf-8")
+    assert history.compact_csv(str(log), remove=True) == 2
+    assert not log.exists()
+    # A new log at the same path starts from scratch
+    log.write_text(LEGACY_LOG, encoding="utf-8")
+    assert history.compact_csv(str(log)) == 2
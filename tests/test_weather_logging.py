@@ -0,0 +1,69 @@
+"""Regression tests for the CSV logging of Weather (ex-4), run against the local stub server."""
+
+import csv
+import importlib.util
+import os
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pandas")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+_spec = importlib.util.spec_from_file_location("ex4", os.path.join(REPO_DIR, "ex-4.py"))
+ex4 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ex4)
+
+
+@pytest.fixture(scope="module")
+def server():
+    with ex4.StubWeatherServer() as server:
+        yield server
+
+
+def logged_cities(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return [row["city"] for row in csv.DictReader(file)]
+
+
+def test_log_many_counts_rows_written(server, tmp_path):
+    log = str(tmp_path / "log.csv")
+    result = ex4.Weather("key", base_url=server.url).log_many(["A", "A", "B"], log)
+    ex4.get_logger(log).close()
+    assert result["logged"] == 2
+    assert sorted(logged_cities(log)) == ["A", "B"]
+
+
+def test_clients_sharing_a_file_keep_row_order(server, tmp_path):
+    log = str(tmp_path / "log.csv")
+    first, second = ex4.Weather("key", base_url=server.url), ex4.Weather("key", base_url=server.url)
+    first.log_weather("one", log)
+    second.log_weather("two", log)
+    first.log_weather("three", log)
+    assert logged_cities(log) == ["one", "two", "three"]
+    assert first.get_logger(log) is second.get_logger(os.path.relpath(log))
+    ex4.get_logger(log).close()
+
+
+def test_exit_flush_follows_creation_order(tmp_path):
+    log = str(tmp_path / "log.csv")
+    older, newer = ex4.WeatherLogger(log), ex4.WeatherLogger(log)
+    older.log({"city": "one"})
+    newer.log({"city": "two"})
+    ex4._flush_open_loggers()
+    assert logged_cities(log) == ["one", "two"]
+    older.close()
+    newer.close()
+
+
+def test_timer_flushes_an_idle_logger(tmp_path):
+    log = str(tmp_path / "log.csv")
+    with ex4.WeatherLogger(log, flush_interval=0.05) as logger:
+        logger.log({"city": "one"})
+        deadline = time.monotonic() + 5
+        while not os.path.exists(log) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert logged_cities(log) == ["one"]